@@ -1,19 +1,42 @@
 import copy
 from enum import Enum
+import functools
+import json
+import math
+import multiprocessing
 import numpy as np
+import os
 import random
 import sys
+import threading
+import time
 
 
 # Constants
 BOARD_WIDTH = 4
 BOARD_HEIGHT = 4
+LARGE_BOARD_DEPTH = 4
+MCTS_ITERATIONS = 1000
+MCTS_EXPLORATION = math.sqrt(2)
+SOLVED_TABLE_FNAME = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+	"solved4x4.npy")
+NO_MOVE = 255
+TABLE_SIZES = (4, 6, 8)
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+DIRECTIONS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0),
+	(1, 1))
 
 
 class Piece(Enum):
 	BLACK = 0
 	WHITE = 1
 
+class SearchAborted(Exception):
+	"""Raised inside a search when it has been asked to stop early"""
+	pass
+
 class GameDriver(object):
 	"""High-level logic for Othello game
 
@@ -24,15 +47,56 @@ class GameDriver(object):
 		result - string detailing game outcome or current game state
 		consec_no_moves - number of consecutive player turns where there were
 			no valid moves
+		quiet - True to suppress all game messages
+		stats - SearchStats of the search currently running
+		last_stats - SearchStats of the most recent AI decision
+		game_stats - SearchStats summed over every AI decision of the game
+		stats_log - open file receiving a JSON line of statistics per AI
+			decision, or None
+		transpositions - TranspositionTable used by the running search, or
+			None to search without one
+		abort - threading.Event stopping the running search once set, or
+			None
+		moves - flat square of every move made in the game, NO_MOVE for a
+			skipped turn
+		recorder - object whose write_game method is called with the
+			GameDriver once the game ends, or None
 	"""
-	def __init__(self, max_player, min_player):
+	def __init__(self, max_player, min_player, width=BOARD_WIDTH,
+		height=BOARD_HEIGHT, quiet=False, stats_log=None, ponder=False,
+		recorder=None):
 		super(GameDriver, self).__init__()
 
-		self.board = Board()
-		self.p1 = HumanPlayer("X") if max_player is 0 else MinimaxPlayer("X")
-		self.p2 = HumanPlayer("O") if min_player is 0 else MinimaxPlayer("O")
+		self.board = Board(width, height)
+
+		# the full game tree is only searchable on the default board size
+		depth = None if width * height <= BOARD_WIDTH * BOARD_HEIGHT \
+			else LARGE_BOARD_DEPTH
+
+		# players are either given directly or chosen as 0 (human) / 1 (AI)
+		if isinstance(max_player, Player):
+			self.p1 = max_player
+		else:
+			self.p1 = HumanPlayer("X") if max_player == 0 \
+				else MinimaxPlayer("X", depth, ponder=ponder)
+
+		if isinstance(min_player, Player):
+			self.p2 = min_player
+		else:
+			self.p2 = HumanPlayer("O") if min_player == 0 \
+				else MinimaxPlayer("O", depth, ponder=ponder)
+
 		self.result = "Game is in progress"
 		self.consec_no_moves = 0
+		self.quiet = quiet
+		self.stats = SearchStats()
+		self.last_stats = None
+		self.game_stats = SearchStats(decisions=0)
+		self.stats_log = stats_log
+		self.transpositions = None
+		self.abort = None
+		self.moves = []
+		self.recorder = recorder
 
 	def player_move(self, p_num):
 		"""Player makes a move
@@ -64,9 +128,10 @@ class GameDriver(object):
 
 				# if the player has no valid moves, skip their turn
 				if len(valid_moves) == 0:
-					print_game_message(
+					self.message(
 						"Player {} has no valid moves!".format(p_num))
 					self.consec_no_moves += 1
+					self.moves.append(NO_MOVE)
 					break
 
 				# print possible moves
@@ -74,16 +139,26 @@ class GameDriver(object):
 					print("[{}]\tRow {}\tColumn {}\tCapture {} pieces".format(
 						idx + 1, move.x, move.y, len(move.bounded_pieces)))
 
+				# let a pondering AI opponent search our likely replies
+				# while we wait on the player's choice
+				opponent = self.p2 if p_num == 1 else self.p1
+				if isinstance(opponent, MinimaxPlayer) and opponent.ponder:
+					opponent.start_pondering(self.board, player.token)
+
 				# collect player's choice
-				choice = int(input("\nSelect a move:"))
+				try:
+					choice = int(input("\nSelect a move:"))
+
+				finally:
+					if isinstance(opponent, MinimaxPlayer) and opponent.ponder:
+						opponent.stop_pondering()
 
 				# error check player's input
 				if choice > 0 and choice <= len(valid_moves):
-					self.board.make_move(valid_moves[choice-1])
-					self.consec_no_moves = 0
+					self.play_move(valid_moves[choice-1])
 					break
 
-				print_game_message("Invalid choice.  Try again.")
+				self.message("Invalid choice.  Try again.")
 
 		else:
 
@@ -93,120 +168,96 @@ class GameDriver(object):
 
 			# if the player has no valid moves, skip their turn
 			if len(valid_moves) == 0:
-				print_game_message(
+				self.message(
 					"AI Player {} has no valid moves!".format(p_num))
 				self.consec_no_moves += 1
+				self.moves.append(NO_MOVE)
 				return
 
-			print_game_message("AI Player {} is making a decision...".format(
+			self.message("AI Player {} is making a decision...".format(
 				p_num))
-			move = self.minimax_decision(self.board, player.token)
-			print_game_message(
+			move = player.get_move(self)
+			self.message(
 				"AI Player {} places a piece at {}, {} and captures {} pieces.".format(
 					p_num, move.x, move.y, len(move.bounded_pieces)))
-			self.board.make_move(move)
+			self.play_move(move)
 
-	def collect_valid_moves(self, game_board, piece):
-		"""Collects all valid moves for the given player color
+	def play_move(self, move):
+		"""Makes a move on the game board and records it
 
 		Args:
-			game_board - game state to iterate through for valid moves
-			piece - Piece enum representing palyer color
+			move - Move object to apply
 
 		Returns:
-			a list of every possible Move object
+			(none)
 
 		Raises:
 			(none)
 		"""
-		valid_moves = []
-		for x in range(game_board.grid.shape[0]):
-			for y in range(game_board.grid.shape[1]):
-
-				result = game_board.determine_valid_move(x, y, piece)
-				if result == 1:
-					continue
-				else:
-					valid_moves.append(Move(x, y, piece, result))
-
-		return valid_moves
+		self.board.make_move(move)
+		self.moves.append(move.x * self.board.grid.shape[1] + move.y)
+		self.consec_no_moves = 0
 
-	def is_stable_piece(self, x, y, game_board):
-		"""Determines if the given piece is stable
+	def message(self, message):
+		"""Prints a game message unless the game is running quietly
 
 		Args:
-			x - x-coordinate of piece to be checked
-			y - y-coordinate of piece to be checked
-			game_board - game state to check
+			message - text message to print
 
 		Returns:
-			1 if stable
-			0 if unstable
+			(none)
 
 		Raises:
 			(none)
 		"""
-		# check row and column
-		for i in range(game_board.grid.shape[0]):
-
-			if game_board.grid[x][i] == " " \
-				or game_board.grid[i][y] == " ":
-				return 0
-
-		# check each of the four diagonals
-		dx = 1
-		dy = 1
-
-		
-		while(x+dx >= 0 and x+dx < game_board.grid.shape[0] \
-			and y+dy >= 0 and y+dy < game_board.grid.shape[1]):
+		if not self.quiet:
+			print_game_message(message)
 
-			if game_board.grid[x+dx][y+dy] == " ":
-				return 0
+	def record_stats(self, stats, piece):
+		"""Records the statistics of an AI decision
 
-			dx += 1
-			dy += 1
-
-		dx = -1
-		dy = -1
-
-		
-		while(x+dx >= 0 and x+dx < game_board.grid.shape[0] \
-			and y+dy >= 0 and y+dy < game_board.grid.shape[1]):
-
-			if game_board.grid[x+dx][y+dy] == " ":
-				return 0
-
-			dx += -1
-			dy += -1
+		Args:
+			stats - SearchStats of the decision
+			piece - Piece enum of the player who made it
 
-		dx = -1
-		dy = 1
+		Returns:
+			(none)
 
-		
-		while(x+dx >= 0 and x+dx < game_board.grid.shape[0] \
-			and y+dy >= 0 and y+dy < game_board.grid.shape[1]):
+		Raises:
+			(none)
+		"""
+		self.last_stats = stats
+		self.game_stats.add(stats)
 
-			if game_board.grid[x+dx][y+dy] == " ":
-				return 0
+		if self.stats_log is not None:
+			record = {"player": "X" if piece == Piece.BLACK else "O"}
+			record.update(stats.to_dict())
+			self.stats_log.write(json.dumps(record) + "\n")
 
-			dx += -1
-			dy += 1
+	def collect_valid_moves(self, game_board, piece):
+		"""Collects all valid moves for the given player color
 
-		dx = 1
-		dy = -1
+		Args:
+			game_board - game state to iterate through for valid moves
+			piece - Piece enum representing palyer color
 
-		
-		while(x+dx >= 0 and x+dx < game_board.grid.shape[0] \
-			and y+dy >= 0 and y+dy < game_board.grid.shape[1]):
+		Returns:
+			a list of every possible Move object
 
-			if game_board.grid[x+dx][y+dy] == " ":
-				return 0
+		Raises:
+			(none)
+		"""
+		valid_moves = []
+		for x in range(game_board.grid.shape[0]):
+			for y in range(game_board.grid.shape[1]):
 
-			dx += 1
-			dy += -1
+				result = game_board.determine_valid_move(x, y, piece)
+				if result == 1:
+					continue
+				else:
+					valid_moves.append(Move(x, y, piece, result))
 
-		return 1
+		return valid_moves
 
 	def utility(self, game_board):
 		"""Used to evaluate utility of a game position
@@ -250,7 +301,7 @@ class GameDriver(object):
 						p1_num_corners += 1
 						p1_num_stable_tks += 1
 
-					elif self.is_stable_piece(x, y, game_board):
+					elif game_board.stable[x][y]:
 						p1_num_stable_tks += 1
 
 				elif game_board.grid[x][y] == "O":
@@ -266,7 +317,7 @@ class GameDriver(object):
 						p2_num_corners += 1
 						p2_num_stable_tks += 1
 
-					elif self.is_stable_piece(x, y, game_board):
+					elif game_board.stable[x][y]:
 						p2_num_stable_tks += 1
 
 		# first heuristic: dominance of piece placement
@@ -301,6 +352,60 @@ class GameDriver(object):
 
 		return util
 
+	def batch_utility(self, boards, stable=None):
+		"""Evaluates the utility of a stack of game positions at once
+
+		Computes the same four heuristics as utility, vectorized over every
+		board of the stack instead of looping over squares.
+
+		Args:
+			boards - N x height x width integer numpy array with 1 for X,
+				-1 for O and 0 for empty squares, see Board.to_array
+			stable - optional N x height x width boolean array of the
+				boards' stable squares, see Board.stable
+
+		Returns:
+			numpy array of the N utility scores
+
+		Raises:
+			(none)
+		"""
+		p1 = boards == 1
+		p2 = boards == -1
+		filled = p1 | p2
+		n, height, width = boards.shape
+
+		# a piece is stable if its row, column and diagonals are all filled
+		if stable is None:
+			row_full = filled.all(axis=2)
+			col_full = filled.all(axis=1)
+			diag, anti_diag = diagonal_masks(height, width)
+			empty = (~filled).reshape(n, -1).astype(np.int64)
+			diag_full = empty.dot(diag) == 0
+			anti_full = empty.dot(anti_diag) == 0
+
+			x, y = np.indices((height, width))
+			stable = row_full[:, x] & col_full[:, y] \
+				& diag_full[:, x - y + width - 1] & anti_full[:, x + y]
+			stable[:, [0, 0, -1, -1], [0, -1, 0, -1]] = True
+
+		corners = boards[:, [0, 0, -1, -1], [0, -1, 0, -1]]
+
+		counts = [
+			(p1.sum(axis=(1, 2)), p2.sum(axis=(1, 2))),
+			(count_valid_moves(p1, p2), count_valid_moves(p2, p1)),
+			((corners == 1).sum(axis=1), (corners == -1).sum(axis=1)),
+			((p1 & stable).sum(axis=(1, 2)), (p2 & stable).sum(axis=(1, 2)))]
+
+		# heuristics with no pieces of either player to compare add nothing
+		util = np.zeros(n)
+		for p1_num, p2_num in counts:
+			total = p1_num + p2_num
+			util += np.divide(p1_num - p2_num, total,
+				out=np.zeros(n), where=total != 0)
+
+		return util
+
 	def successors(self, game_board, piece):
 		"""Takes current game state and generates all succesors within 1 move
 
@@ -325,92 +430,275 @@ class GameDriver(object):
 
 		return s_list
 
-	def minimax_decision(self, game_board, piece):
+	def minimax_decision(self, game_board, piece, depth=None, workers=1,
+		transpositions=None):
 		"""Performs Minimax algorithm for AI and returns AI's move
 
+		Each move available at the root is searched with alpha-beta pruning
+		and the first move reaching the best value is selected.  When more
+		than one worker is requested the root moves are split across a
+		process pool instead, see parallel_root_search.
+
 		Args:
 			game_board - game state of the AI player's turn
 			piece - Piece enum corresponding to AI player's color
+			depth - number of plies to search, or None to search to the end
+				of the game
+			workers - number of processes to split the root moves over
+			transpositions - TranspositionTable to read and fill during a
+				serial search, or None
 
 		Returns:
-			move - the move that the AI player selects
+			2-tuple of the move that the AI player selects and the
+			SearchStats of the search
 
 		Raises:
-			(none)
+			SearchAborted if self.abort is set during the search
 		"""
-		if piece == Piece.BLACK:
-			val = self.max_value(game_board)
-			print_game_message("Move utility: {}".format(val))
+		start = time.perf_counter()
 
-			for move, state in self.successors(game_board, Piece.BLACK):
-				if val == self.max_value(game_board):
-					return move
+		if workers > 1:
+			val, move, stats = parallel_root_search(game_board, piece, depth,
+				workers)
 
 		else:
-			val = self.min_value(game_board)
-			print_game_message("Move utility: {}".format(val))
+			self.stats = SearchStats()
+			self.transpositions = transpositions
+			try:
+				val, move = self.root_search(game_board, piece, depth)
+			finally:
+				self.transpositions = None
+			stats = self.stats
 
-			for move, state in self.successors(game_board, Piece.WHITE):
-				if val == self.min_value(game_board):
-					return move
+		stats.elapsed = time.perf_counter() - start
+		self.message("Move utility: {}".format(val))
+		return move, stats
+
+	def root_search(self, game_board, piece, depth=None):
+		"""Searches every root move serially and picks the best one
+
+		Statistics are collected into self.stats.
+
+		Args:
+			game_board - game state of the AI player's turn
+			piece - Piece enum corresponding to AI player's color
+			depth - number of plies to search, or None for the full game
+
+		Returns:
+			2-tuple of the best utility and the first move reaching it
+
+		Raises:
+			(none)
+		"""
+		best_val = -np.inf if piece == Piece.BLACK else np.inf
+		best_move = None
+
+		self.stats.nodes += 1
+		for move, state in self.search_successors(game_board, piece):
+
+			if piece == Piece.BLACK:
+				val = self.min_value(state, best_val, np.inf,
+					next_depth(depth))
+				improved = val > best_val
+
+			else:
+				val = self.max_value(state, -np.inf, best_val,
+					next_depth(depth))
+				improved = val < best_val
+
+			if best_move is None or improved:
+				best_val = val
+				best_move = move
 
-	def max_value(self, game_board):
+		return best_val, best_move
+
+	def max_value(self, game_board, alpha=-np.inf, beta=np.inf, depth=None,
+		ply=1):
 		"""Recursive function finds the maximum value for the provided state
 
 		Args:
 			game_board - the current game state
+			alpha - best value MAX can already guarantee higher in the tree
+			beta - best value MIN can already guarantee higher in the tree
+			depth - plies left to search, or None to search to the end
+			ply - number of plies between the root and this state
 
 		Returns:
-			val - the maximum value of the current state
+			val - the maximum value of the current state, or a bound on it
+				if it falls outside of the alpha-beta window
 
 		Raises:
-			(none)
+			SearchAborted if self.abort has been set
 		"""
+		if self.abort is not None and self.abort.is_set():
+			raise SearchAborted("Search stopped.")
+
+		self.stats.visit(ply)
+		if self.transpositions is not None:
+			key = canonical_key(game_board, Piece.BLACK)[0]
+			val = self.transpositions.lookup(key, depth, alpha, beta)
+			if val is not None:
+				self.stats.tt_hits += 1
+				return val
+
+		window = (alpha, beta)
+		start = time.perf_counter()
 		valid_moves = self.collect_valid_moves(game_board, Piece.BLACK)
+		self.stats.movegen_time += time.perf_counter() - start
 
 		# base case
-		if len(valid_moves) == 0:
-			return self.utility(game_board)
+		if len(valid_moves) == 0 or depth == 0:
+			val = self.search_utility([game_board])[0]
+
+		# evaluate every leaf child in one batch
+		elif depth == 1:
+			states = [state for move, state
+				in self.search_successors(game_board, Piece.BLACK)]
+			for state in states:
+				self.stats.visit(ply + 1)
+			val = self.search_utility(states).max()
+
+		else:
+			val = -np.inf
+			for move, state in self.search_successors(game_board,
+				Piece.BLACK):
+				val = max(val, self.min_value(state, alpha, beta,
+					next_depth(depth), ply + 1))
+
+				# MIN will never allow this state to be reached
+				if val >= beta:
+					self.stats.cutoffs += 1
+					break
 
-		val = -np.inf
-		for move, state in self.successors(game_board, Piece.BLACK):
-			val = max(val, self.min_value(state))
+				alpha = max(alpha, val)
+
+		if self.transpositions is not None:
+			self.transpositions.store(key, depth, val, *window)
 
 		return val
 
-	def min_value(self, game_board):
+	def min_value(self, game_board, alpha=-np.inf, beta=np.inf, depth=None,
+		ply=1):
 		"""Recursive function finds the minimum value for the provided state
 
 		Args:
 			game_board - the current game state
+			alpha - best value MAX can already guarantee higher in the tree
+			beta - best value MIN can already guarantee higher in the tree
+			depth - plies left to search, or None to search to the end
+			ply - number of plies between the root and this state
 
 		Returns:
-			val - the minimum value of the current state
+			val - the minimum value of the current state, or a bound on it
+				if it falls outside of the alpha-beta window
 
 		Raises:
-			(none)
+			SearchAborted if self.abort has been set
 		"""
+		if self.abort is not None and self.abort.is_set():
+			raise SearchAborted("Search stopped.")
+
+		self.stats.visit(ply)
+		if self.transpositions is not None:
+			key = canonical_key(game_board, Piece.WHITE)[0]
+			val = self.transpositions.lookup(key, depth, alpha, beta)
+			if val is not None:
+				self.stats.tt_hits += 1
+				return val
+
+		window = (alpha, beta)
+		start = time.perf_counter()
 		valid_moves = self.collect_valid_moves(game_board, Piece.WHITE)
+		self.stats.movegen_time += time.perf_counter() - start
 
 		# base case
-		if len(valid_moves) == 0:
-			return self.utility(game_board)
+		if len(valid_moves) == 0 or depth == 0:
+			val = self.search_utility([game_board])[0]
 
-		val = np.inf
-		for move, state in self.successors(game_board, Piece.WHITE):
-			val = min(val, self.max_value(state))
+		# evaluate every leaf child in one batch
+		elif depth == 1:
+			states = [state for move, state
+				in self.search_successors(game_board, Piece.WHITE)]
+			for state in states:
+				self.stats.visit(ply + 1)
+			val = self.search_utility(states).min()
+
+		else:
+			val = np.inf
+			for move, state in self.search_successors(game_board,
+				Piece.WHITE):
+				val = min(val, self.max_value(state, alpha, beta,
+					next_depth(depth), ply + 1))
+
+				# MAX will never allow this state to be reached
+				if val <= alpha:
+					self.stats.cutoffs += 1
+					break
+
+				beta = min(beta, val)
+
+		if self.transpositions is not None:
+			self.transpositions.store(key, depth, val, *window)
 
 		return val
 
-	def calculate_winner(self):
-		"""Tallies up the number of pieces for each player
+	def search_successors(self, game_board, piece):
+		"""successors, timed as move generation in self.stats
 
 		Args:
+			game_board - game state to generate successors for
+			piece - Piece enum representing player color
+
+		Returns:
+			a list of 2-tuples containing a move and the corresponding
+			state
+
+		Raises:
 			(none)
+		"""
+		start = time.perf_counter()
+		s_list = self.successors(game_board, piece)
+		self.stats.movegen_time += time.perf_counter() - start
+
+		return s_list
+
+	def search_utility(self, game_boards):
+		"""Evaluates leaf states of the search, timed in self.stats
+
+		A single state is scored with utility, several at once with
+		batch_utility.
+
+		Args:
+			game_boards - list of Board objects to evaluate
 
 		Returns:
+			numpy array of their utility scores
+
+		Raises:
+			(none)
+		"""
+		start = time.perf_counter()
+		if len(game_boards) == 1:
+			vals = np.array([self.utility(game_boards[0])])
+		else:
+			vals = self.batch_utility(
+				np.array([state.to_array() for state in game_boards]),
+				np.array([state.stable for state in game_boards]))
+
+		self.stats.leaves += len(game_boards)
+		self.stats.eval_time += time.perf_counter() - start
+
+		return vals
+
+	def score(self):
+		"""Counts the pieces each player has on the board
+
+		Args:
 			(none)
 
+		Returns:
+			2-tuple of player 1's and player 2's number of pieces
+
 		Raises:
 			(none)
 		"""
@@ -424,6 +712,22 @@ class GameDriver(object):
 				elif self.board.grid[x][y] == "O":
 					p2_s += 1
 
+		return p1_s, p2_s
+
+	def calculate_winner(self):
+		"""Tallies up the number of pieces for each player
+
+		Args:
+			(none)
+
+		Returns:
+			(none)
+
+		Raises:
+			(none)
+		"""
+		p1_s, p2_s = self.score()
+
 		if p1_s > p2_s:
 			self.result = "Player 1 wins! {}-{}".format(p1_s, p2_s)
 		elif p2_s > p1_s:
@@ -445,6 +749,12 @@ class GameDriver(object):
 			(none)
 		"""
 		if self.consec_no_moves >= 2:
+
+			# record the game the first time its end is noticed
+			if self.recorder is not None \
+				and self.result == "Game is in progress":
+				self.recorder.write_game(self)
+
 			self.calculate_winner()
 			return True
 		else:	
@@ -469,219 +779,1440 @@ class HumanPlayer(Player):
 		super(HumanPlayer, self).__init__(token)
 		
 class MinimaxPlayer(Player):
-	"""docstring for MinimaxPlayer
-	"""
-	def __init__(self, token):
-		super(MinimaxPlayer, self).__init__(token)
-
-	def get_move(self):
-		pass
-		
-class Board(object):
-	"""Grid for an Othello/Reversi board.
-
-		Contains the grid of the game board and methods for adding pieces.
+	"""AI player choosing moves with the minimax algorithm
 
 		Attributes:
-			grid - a 2D numpy array of strings corresponding to the pieces
-				on the board
+			max_depth - plies to search, or None to search the full game tree
+			workers - processes to split the search over, or None to use
+				every core on boards larger than the default size
+			ponder - True to search the opponent's likely replies while a
+				human opponent is deciding
+			transpositions - TranspositionTable shared by the player's own
+				and pondering searches, or None when not pondering
+			pondered - dictionary from a position reached by an opponent
+				reply to the (x, y) of the move found for it while pondering
+			ponder_thread - background threading.Thread currently pondering
+			ponder_stop - threading.Event asking the ponder thread to stop
 	"""
-	def __init__(self):
-		super(Board, self).__init__()
-		self.grid = np.array([[" ", " ", " ", " "],
-			[" ", "O", "X", " "],
-			[" ", "X", "O", " "],
-			[" ", " ", " ", " "]])
+	def __init__(self, token, max_depth=None, workers=None, ponder=False):
+		super(MinimaxPlayer, self).__init__(token)
 
-	def determine_valid_move(self, x, y, piece):
-		"""Adds a game piece to the board and adjusts the board state
+		self.max_depth = max_depth
+		self.workers = workers
+		self.ponder = ponder
+		self.transpositions = TranspositionTable() if ponder else None
+		self.pondered = {}
+		self.ponder_thread = None
+		self.ponder_stop = threading.Event()
+
+	def get_move(self, game):
+		"""Searches the game's current board for the best move
 
 		Args:
-			x - the x-coordinate of the location to place a piece
-			y - the y-coordinate of the location to place a piece
-			piece - the Piece enum object of the color being placed
+			game - GameDriver holding the board to move on
 
 		Returns:
-			0 if the move was successful, 1 if it was invalid
+			the Move object selected by the search
 
 		Raises:
-			ValueError if the piece argument is not passed correctly
+			(none)
 		"""
+		# the default board size is solved, so play perfectly from the table
+		if game.board.grid.shape == (BOARD_HEIGHT, BOARD_WIDTH) \
+			and SOLVED_TABLE is not None:
+
+			start = time.perf_counter()
+			entry = solved_lookup(SOLVED_TABLE, game.board, self.token)
+			if entry is not None and entry[1] is not None:
+
+				game.message("Solved position value: {}".format(entry[0]))
+				game.record_stats(SearchStats(nodes=1, tt_hits=1,
+					elapsed=time.perf_counter() - start), self.token)
+				for move in game.collect_valid_moves(game.board, self.token):
+					if (move.x, move.y) == entry[1]:
+						return move
+
+		# the position may have been searched while pondering
+		start = time.perf_counter()
+		square = self.pondered.get(game.board.grid.tobytes())
+		self.pondered = {}
+		if square is not None:
+
+			game.record_stats(SearchStats(nodes=1, tt_hits=1,
+				elapsed=time.perf_counter() - start), self.token)
+			for move in game.collect_valid_moves(game.board, self.token):
+				if (move.x, move.y) == square:
+					return move
 
-		# check if space is already occupied
-		if self.grid[x][y] != " ":
-			return 1
-
-		# check if token is being placed adjacent to an opposing piece and
-		# if it is, we look to see if a bound can be found, adding all the
-		# opponent's pieces inbetween to the turnover array
-		turnover_pieces = []
-		adj = False
-		for i in range(x - 1, x + 2):
-			for j in range(y - 1, y + 2):
-
-				# efficiency, skip the location we're currently trying to
-				# place into
-				if i == x and j == y:
-					continue
-
-				# check grid bounds to avoid indexing errors
-				if i >= 0 and i < self.grid.shape[0] \
-					and j >= 0 and j < self.grid.shape[1]:
-
-					# if the piece in the current location is opposite of the
-					# player placing a piece, look for bounds
-					if (self.grid[i][j] == "X" and piece == Piece.WHITE) \
-						or (self.grid[i][j] == "O" and piece == Piece.BLACK):
-						
-						# subtracting the difference between the center
-						# location and the surrounding squares gives us
-						# a relative position indicating a direction
-						turnover_pieces += self.collect_bounded(
-							x, y, i - x, j - y, piece)
+		# pondering shares its table with the serial search only
+		workers = self.workers
+		if workers is None:
+			workers = os.cpu_count() if game.board.grid.size \
+				> BOARD_WIDTH * BOARD_HEIGHT and not self.ponder else 1
 
-		if len(turnover_pieces) == 0:
-			return 1
+		move, stats = game.minimax_decision(game.board, self.token,
+			self.max_depth, workers, self.transpositions)
+		game.record_stats(stats, self.token)
 
-		else:
-			return turnover_pieces
-			
+		return move
 
-	def collect_bounded(self, x, y, rx, ry, piece):
-		"""Determines pieces bounded between opponent pieces
+	def start_pondering(self, game_board, piece):
+		"""Starts searching the opponent's replies in a background thread
 
 		Args:
-			x - x-coordinate of the anchor bounding piece
-			y - y-coordinate of the anchor bounding piece
-			rx - relative x-direction to iterate in
-			ry - relative y-direction to iterate in
-			piece - Piece color to check for 2nd bound
+			game_board - Board object the opponent is about to move on
+			piece - Piece enum of the opponent
 
 		Returns:
-			list of tuples of bounded pieces, or an empty list
+			(none)
 
 		Raises:
 			(none)
 		"""
-		# we will continue iterating in the direction dictated by rx and ry
-		# until we reach a blank, the edge of the grid, or the placing piece
-		bounded_pieces = []
-		shift_x = rx
-		shift_y = ry
-		while(x + shift_x < self.grid.shape[0]
-			and x + shift_x >= 0
-			and y + shift_y < self.grid.shape[1]
-			and y + shift_y >= 0
-			and self.grid[x+shift_x][y+shift_y] != " "):
-		
-			if (self.grid[x+shift_x][y+shift_y] == "X" \
-				and piece == Piece.BLACK) \
-				or (self.grid[x+shift_x][y+shift_y] == "O" \
-				and piece == Piece.WHITE):
+		self.stop_pondering()
+		self.ponder_stop.clear()
+		self.ponder_thread = threading.Thread(target=self.ponder_replies,
+			args=(copy.deepcopy(game_board), piece), daemon=True)
+		self.ponder_thread.start()
 
-				return bounded_pieces
+	def stop_pondering(self):
+		"""Stops the background search and waits for it to finish
 
-			bounded_pieces.append((x+shift_x, y+shift_y))
+		Args:
+			(none)
+
+		Returns:
+			(none)
 
-			shift_x += rx
-			shift_y += ry
+		Raises:
+			(none)
+		"""
+		if self.ponder_thread is not None:
+			self.ponder_stop.set()
+			self.ponder_thread.join()
+			self.ponder_thread = None
 
-		# if we never reached a second bounding piece, return empty list
-		return []
+	def ponder_replies(self, game_board, piece):
+		"""Searches the player's answer to each opponent reply in turn
 
-	def make_move(self, move):
-		"""Applies a Move object to the game board and changes game state
+		Replies are searched from the most to the least promising for the
+		opponent by utility.  Finished searches are kept in pondered, and
+		every search fills the shared transposition table so an unfinished
+		one still speeds up the real search.
 
 		Args:
-			move - Move object with coordinates of move, piece to place,
-				and bounded pieces to convert
+			game_board - Board object the opponent is about to move on
+			piece - Piece enum of the opponent
 
 		Returns:
 			(none)
 
 		Raises:
-			ValueError if the piece argument of the Move object is invalid
+			(none)
 		"""
-		for bounded_piece in move.bounded_pieces:
-				if move.piece == Piece.BLACK:
-					self.grid[bounded_piece[0]][bounded_piece[1]] = "X"
-				else:
-					self.grid[bounded_piece[0]][bounded_piece[1]] = "O"
+		height, width = game_board.grid.shape
+		game = GameDriver(1, 1, width, height, quiet=True)
+		game.abort = self.ponder_stop
+
+		replies = game.successors(game_board, piece)
+		sign = 1 if piece == Piece.BLACK else -1
+		replies.sort(key=lambda reply: -sign * game.utility(reply[1]))
+
+		for reply, state in replies:
+			try:
+				move, stats = game.minimax_decision(state, self.token,
+					self.max_depth, 1, self.transpositions)
+			except SearchAborted:
+				return
 
-		if move.piece == Piece.BLACK:
-			self.grid[move.x][move.y] = "X"
+			if move is not None:
+				self.pondered[state.grid.tobytes()] = (move.x, move.y)
 
-		elif move.piece == Piece.WHITE:
-			self.grid[move.x][move.y] = "O"
+class RandomPlayer(Player):
+	"""AI player picking uniformly among its valid moves
 
-		else:
-			raise ValueError(
-				"Piece argument must be Piece.BLACK or Piece.WHITE.")
+		Attributes:
+			rng - random.Random instance used to choose moves
+	"""
+	def __init__(self, token, seed=None):
+		super(RandomPlayer, self).__init__(token)
 
-	def print(self):
-		"""Prints the board state to terminal
+		self.rng = random.Random(seed)
+
+	def get_move(self, game):
+		"""Chooses a random valid move on the game's current board
 
 		Args:
-			(none)
+			game - GameDriver holding the board to move on
 
 		Returns:
-			(none)
+			a randomly selected Move object
 
 		Raises:
 			(none)
 		"""
-		for x in range(2*BOARD_WIDTH + 2):
-			for y in range(2*BOARD_HEIGHT + 2):
+		return self.rng.choice(game.collect_valid_moves(game.board,
+			self.token))
 
-				if x == 0 and y == 0:
-					print(" ", end="", flush=True)
+class MCTSPlayer(Player):
+	"""AI player choosing moves with Monte Carlo Tree Search
 
-				elif x % 2 == 1 and y == 0:
-					print("  ", end="", flush=True)
+		Nodes are selected with UCT and evaluated by playing random games
+		out on a flat list of integers, which is far cheaper to copy and
+		update than a Board.  The subtree under the position reached after
+		each move is kept and reused for the next decision.
 
-				elif x % 2 == 1 and y <= BOARD_WIDTH:
-					print(" ---", end="", flush=True)
+		Attributes:
+			iterations - number of playouts per move, or None
+			time_limit - seconds to search per move, or None
+			exploration - UCT exploration constant
+			light - True to always take an available corner in playouts
+			rng - random.Random instance used by the search
+			root - MCTSNode of the last position searched, for tree reuse
+	"""
+	def __init__(self, token, iterations=None, time_limit=None,
+		exploration=MCTS_EXPLORATION, light=False, seed=None):
+		super(MCTSPlayer, self).__init__(token)
 
-				elif y == 0 and x % 2 == 0 and x > 0:
-					print("{} ".format(int(x/2)-1), end="", flush=True)
+		# with no budget given fall back to a fixed number of playouts
+		if iterations is None and time_limit is None:
+			iterations = MCTS_ITERATIONS
 
-				elif x == 0 and y % 2 == 0 and y > 0:
-					print("{}".format(int(y/2)-1), end="", flush=True)
+		self.iterations = iterations
+		self.time_limit = time_limit
+		self.exploration = exploration
+		self.light = light
+		self.rng = random.Random(seed)
+		self.root = None
 
-				elif x == 0 and y % 2 == 1:
-					print("   ", end="", flush=True)
+	def get_move(self, game):
+		"""Runs playouts from the game's current board and picks a move
 
-				elif x % 2 == 0 and x != 0 and y % 2 == 1:
-					print("|", end="", flush=True)
+		Args:
+			game - GameDriver holding the board to move on
+
+		Returns:
+			the Move object of the most visited root child
+
+		Raises:
+			(none)
+		"""
+		height, width = game.board.grid.shape
+		rays = flat_ray_table(height, width)
+		cells = tuple(game.board.to_array().ravel().tolist())
+		player = 1 if self.token == Piece.BLACK else -1
+
+		root = self.reuse_root(cells, player)
+		if root is None:
+			root = MCTSNode(cells, player, rays)
+
+		start = time.perf_counter()
+		deadline = None if self.time_limit is None \
+			else start + self.time_limit
+		stats = SearchStats()
+		stats.visit(0)
+		iterations = 0
+
+		# the budget is checked after each playout, so the root always has
+		# at least one child to choose from
+		while True:
+
+			node = root
+
+			# selection
+			ply = 0
+			while len(node.untried) == 0 and len(node.children) > 0:
+				node = node.select_child(self.exploration)
+				ply += 1
+
+			# expansion
+			if len(node.untried) > 0:
+				node = node.expand(
+					node.untried.pop(self.rng.randrange(len(node.untried))),
+					rays)
+				ply += 1
+
+			# simulation and backpropagation, the leaf played out from is
+			# counted as visited like a minimax leaf
+			stats.visit(ply)
+			winner = self.playout(node.cells, node.player, rays)
+			while node is not None:
+				node.update(winner)
+				node = node.parent
+
+			iterations += 1
+			if (self.iterations is not None and iterations >= self.iterations) \
+				or (deadline is not None and time.perf_counter() >= deadline):
+				break
+
+		stats.leaves = iterations
+		stats.elapsed = time.perf_counter() - start
+		game.record_stats(stats, self.token)
+
+		best = max(root.children, key=lambda child: child.visits)
+		self.root = best
+		game.message("Move win rate: {:.3f}".format(best.wins / best.visits))
+
+		x, y = divmod(best.move, width)
+		for move in game.collect_valid_moves(game.board, self.token):
+			if (move.x, move.y) == (x, y):
+				return move
+
+	def reuse_root(self, cells, player):
+		"""Finds the current position in the tree kept from the last move
+
+		Args:
+			cells - flat tuple of the current board
+			player - 1 if X is to move, -1 if O is
+
+		Returns:
+			the matching MCTSNode detached from its parent, or None
+
+		Raises:
+			(none)
+		"""
+		if self.root is None:
+			return None
+
+		# the opponent either moved or passed since our last decision
+		for node in [self.root] + self.root.children:
+			if node.cells == cells and node.player == player:
+				node.parent = None
+				return node
+
+		return None
+
+	def playout(self, cells, player, rays):
+		"""Plays random moves from a position until the game ends
+
+		Args:
+			cells - flat tuple of the board to play out from
+			player - 1 if X is to move, -1 if O is
+			rays - flat ray table of the board size
+
+		Returns:
+			1 if X wins, -1 if O wins, 0 for a tie
+
+		Raises:
+			(none)
+		"""
+		cells = list(cells)
+		passes = 0
+		while passes < 2:
+
+			moves = fast_valid_moves(cells, player, rays)
+			if len(moves) == 0:
+				passes += 1
+
+			else:
+				passes = 0
+				square, flips = self.choose_playout_move(moves, rays)
+				fast_make_move(cells, player, square, flips)
+
+			player = -player
+
+		diff = sum(cells)
+		return (diff > 0) - (diff < 0)
+
+	def choose_playout_move(self, moves, rays):
+		"""Picks the next move of a playout
+
+		Args:
+			moves - list of (square, flips) moves available
+			rays - flat ray table of the board size
+
+		Returns:
+			the selected (square, flips) move
+
+		Raises:
+			(none)
+		"""
+		if self.light:
+
+			# corners are the only squares with three rays and can never be
+			# flipped back, so always take one
+			corners = [move for move in moves if len(rays[move[0]]) == 3]
+			if len(corners) > 0:
+				return self.rng.choice(corners)
+
+		return self.rng.choice(moves)
+		
+class Board(object):
+	"""Grid for an Othello/Reversi board.
+
+		Contains the grid of the game board and methods for adding pieces.
+
+		Stability of the pieces is tracked as pieces are placed.  A piece is
+		stable if it is in a corner or if its row, column and both diagonals
+		are completely filled, which can never be undone.
+
+		Attributes:
+			grid - a 2D numpy array of strings corresponding to the pieces
+				on the board
+			line_fill - numpy array counting the filled squares of every
+				line, indexed as in line_index_table
+			stable - 2D boolean numpy array of the stable squares
+	"""
+	def __init__(self, width=BOARD_WIDTH, height=BOARD_HEIGHT):
+		super(Board, self).__init__()
+		grid = np.full((height, width), " ")
+
+		# standard starting position of four pieces around the center
+		cx = height // 2
+		cy = width // 2
+		grid[cx - 1][cy - 1] = "O"
+		grid[cx - 1][cy] = "X"
+		grid[cx][cy - 1] = "X"
+		grid[cx][cy] = "O"
+
+		self.set_grid(grid)
+
+	def set_grid(self, grid):
+		"""Replaces the grid and recounts the filled lines and stable squares
+
+		Args:
+			grid - 2D numpy array of " ", "X" and "O" strings
+
+		Returns:
+			(none)
+
+		Raises:
+			(none)
+		"""
+		self.grid = grid
+		height, width = grid.shape
+		lines = line_index_table(height, width)[0]
+
+		self.line_fill = np.zeros(len(lines), dtype=np.int64)
+		self.stable = np.zeros((height, width), dtype=bool)
+		for x, y in zip(*np.nonzero(grid != " ")):
+			self.fill_square(x, y)
+
+	def determine_valid_move(self, x, y, piece):
+		"""Adds a game piece to the board and adjusts the board state
+
+		Args:
+			x - the x-coordinate of the location to place a piece
+			y - the y-coordinate of the location to place a piece
+			piece - the Piece enum object of the color being placed
+
+		Returns:
+			0 if the move was successful, 1 if it was invalid
+
+		Raises:
+			ValueError if the piece argument is not passed correctly
+		"""
+
+		# check if space is already occupied
+		if self.grid[x][y] != " ":
+			return 1
+
+		# look for a bound along every ray leaving the square, adding all
+		# the opponent's pieces inbetween to the turnover array
+		turnover_pieces = []
+		for direction in ray_table(*self.grid.shape)[x][y]:
+			turnover_pieces += self.collect_bounded(
+				x, y, direction[0], direction[1], piece)
+
+		if len(turnover_pieces) == 0:
+			return 1
+
+		else:
+			return turnover_pieces
+			
+
+	def collect_bounded(self, x, y, rx, ry, piece):
+		"""Determines pieces bounded between opponent pieces
+
+		Args:
+			x - x-coordinate of the anchor bounding piece
+			y - y-coordinate of the anchor bounding piece
+			rx - relative x-direction to iterate in
+			ry - relative y-direction to iterate in
+			piece - Piece color to check for 2nd bound
+
+		Returns:
+			list of tuples of bounded pieces, or an empty list
+
+		Raises:
+			(none)
+		"""
+		# we will continue iterating along the ray dictated by rx and ry
+		# until we reach a blank, the edge of the grid, or the placing piece
+		own = "X" if piece == Piece.BLACK else "O"
+		bounded_pieces = []
+		for square in ray_table(*self.grid.shape)[x][y].get((rx, ry), ()):
+
+			if self.grid[square] == " ":
+				break
+
+			if self.grid[square] == own:
+				return bounded_pieces
+
+			bounded_pieces.append(square)
+
+		# if we never reached a second bounding piece, return empty list
+		return []
+
+	def make_move(self, move):
+		"""Applies a Move object to the game board and changes game state
+
+		Args:
+			move - Move object with coordinates of move, piece to place,
+				and bounded pieces to convert
+
+		Returns:
+			(none)
+
+		Raises:
+			ValueError if the piece argument of the Move object is invalid
+		"""
+		for bounded_piece in move.bounded_pieces:
+				if move.piece == Piece.BLACK:
+					self.grid[bounded_piece[0]][bounded_piece[1]] = "X"
+				else:
+					self.grid[bounded_piece[0]][bounded_piece[1]] = "O"
+
+		if move.piece == Piece.BLACK:
+			self.grid[move.x][move.y] = "X"
+
+		elif move.piece == Piece.WHITE:
+			self.grid[move.x][move.y] = "O"
+
+		else:
+			raise ValueError(
+				"Piece argument must be Piece.BLACK or Piece.WHITE.")
+
+		# flipping pieces never changes which squares are filled
+		self.fill_square(move.x, move.y)
+
+	def fill_square(self, x, y):
+		"""Updates the line counters and stable squares for a new piece
+
+		Args:
+			x - x-coordinate of the square that was filled
+			y - y-coordinate of the square that was filled
+
+		Returns:
+			(none)
+
+		Raises:
+			(none)
+		"""
+		height, width = self.grid.shape
+		lines, square_lines, line_sizes = line_index_table(height, width)
+
+		if (x == 0 or x == height - 1) and (y == 0 or y == width - 1):
+			self.stable[x][y] = True
+
+		for line in square_lines[x][y]:
+
+			self.line_fill[line] += 1
+			if self.line_fill[line] < line_sizes[line]:
+				continue
+
+			# the line was just completed, so its squares may now be stable
+			for i, j in lines[line]:
+				if all(self.line_fill[other] == line_sizes[other]
+					for other in square_lines[i][j]):
+					self.stable[i][j] = True
+
+	def to_array(self):
+		"""Converts the grid to integers for vectorized evaluation
+
+		Args:
+			(none)
+
+		Returns:
+			2D numpy int8 array with 1 for X, -1 for O and 0 for empty
+
+		Raises:
+			(none)
+		"""
+		return (self.grid == "X").astype(np.int8) \
+			- (self.grid == "O").astype(np.int8)
+
+	def print(self):
+		"""Prints the board state to terminal
+
+		Args:
+			(none)
+
+		Returns:
+			(none)
+
+		Raises:
+			(none)
+		"""
+		for x in range(2*self.grid.shape[0] + 2):
+			for y in range(2*self.grid.shape[1] + 2):
+
+				if x == 0 and y == 0:
+					print(" ", end="", flush=True)
+
+				elif x % 2 == 1 and y == 0:
+					print("  ", end="", flush=True)
+
+				elif x % 2 == 1 and y <= self.grid.shape[1]:
+					print(" ---", end="", flush=True)
+
+				elif y == 0 and x % 2 == 0 and x > 0:
+					print("{} ".format(int(x/2)-1), end="", flush=True)
+
+				elif x == 0 and y % 2 == 0 and y > 0:
+					print("{}".format(int(y/2)-1), end="", flush=True)
+
+				elif x == 0 and y % 2 == 1:
+					print("   ", end="", flush=True)
+
+				elif x % 2 == 0 and x != 0 and y % 2 == 1:
+					print("|", end="", flush=True)
 
 				elif x % 2 == 0 and y != 0:
 					print(" {} ".format(self.grid[int(x/2) - 1][int(y/2) - 1]),
 						end="", flush=True)
 
-			print("\n", end="")
+			print("\n", end="")
+
+class Move(object):
+	"""Container for a valid move a player may make
+
+	Attributes:
+		x - x-coordinate of location to place a piece
+		y - y-coordinate of location to place a piece
+		piece - Piece enum representing player color
+		bounded_pieces - list of tuples of pieces to convert
+	"""
+	def __init__(self, x, y, piece, bounded_pieces):
+		super(Move, self).__init__()
+		self.x = x
+		self.y = y
+		self.piece = piece
+		self.bounded_pieces = bounded_pieces
+			
+class MCTSNode(object):
+	"""Node of the Monte Carlo search tree
+
+	Attributes:
+		cells - flat tuple of the board, 1 for X, -1 for O and 0 for empty
+		player - 1 if X is to move, -1 if O is
+		move - flat square of the move leading here, None for a pass
+		parent - MCTSNode this node was expanded from, or None for the root
+		children - list of expanded child MCTSNodes
+		untried - list of (square, flips) moves not expanded yet, holding
+			None for a forced pass
+		visits - number of playouts through this node
+		wins - playouts won by the player who moved into this node, with
+			ties counted as half a win
+	"""
+	def __init__(self, cells, player, rays, move=None, parent=None):
+		super(MCTSNode, self).__init__()
+		self.cells = cells
+		self.player = player
+		self.move = move
+		self.parent = parent
+		self.children = []
+		self.visits = 0
+		self.wins = 0.0
+
+		self.untried = fast_valid_moves(cells, player, rays)
+		if len(self.untried) == 0 \
+			and len(fast_valid_moves(cells, -player, rays)) > 0:
+			self.untried = [None]
+
+	def select_child(self, exploration):
+		"""Picks the child with the highest UCT score
+
+		Args:
+			exploration - UCT exploration constant
+
+		Returns:
+			the selected child MCTSNode
+
+		Raises:
+			(none)
+		"""
+		log_visits = math.log(self.visits)
+		return max(self.children, key=lambda child: child.wins / child.visits
+			+ exploration * math.sqrt(log_visits / child.visits))
+
+	def expand(self, move, rays):
+		"""Adds a child node for an untried move
+
+		Args:
+			move - (square, flips) move to play, or None to pass
+			rays - flat ray table of the board size
+
+		Returns:
+			the new child MCTSNode
+
+		Raises:
+			(none)
+		"""
+		cells = list(self.cells)
+		square = None
+		if move is not None:
+			square, flips = move
+			fast_make_move(cells, self.player, square, flips)
+
+		child = MCTSNode(tuple(cells), -self.player, rays, square, self)
+		self.children.append(child)
+		return child
+
+	def update(self, winner):
+		"""Records the result of a playout through this node
+
+		Args:
+			winner - 1 if X won, -1 if O won, 0 for a tie
+
+		Returns:
+			(none)
+
+		Raises:
+			(none)
+		"""
+		self.visits += 1
+
+		# the player who moved into this node is the one to move at the parent
+		if winner == 0:
+			self.wins += 0.5
+		elif winner == -self.player:
+			self.wins += 1
+
+class TranspositionTable(object):
+	"""Cache of values found by the alpha-beta search
+
+	Values outside the window they were searched with are only bounds on
+	the true value and are flagged as such.  Entries are only used for a
+	search to the same depth, so cached values are exactly what the search
+	would have found itself.
+
+	Attributes:
+		entries - dictionary from a position key to a 3-tuple of the depth
+			searched, the value found and its EXACT/LOWER_BOUND/UPPER_BOUND
+			flag
+	"""
+	def __init__(self):
+		super(TranspositionTable, self).__init__()
+		self.entries = {}
+
+	def lookup(self, key, depth, alpha, beta):
+		"""Finds a cached value usable in the given search window
+
+		Args:
+			key - position key
+			depth - plies left to search, or None for an unlimited search
+			alpha - best value MAX can already guarantee
+			beta - best value MIN can already guarantee
+
+		Returns:
+			the cached value, or None if there is no usable entry
+
+		Raises:
+			(none)
+		"""
+		entry = self.entries.get(key)
+		if entry is None or entry[0] != depth:
+			return None
+
+		val, flag = entry[1], entry[2]
+		if flag == EXACT or (flag == LOWER_BOUND and val >= beta) \
+			or (flag == UPPER_BOUND and val <= alpha):
+			return val
+
+		return None
+
+	def store(self, key, depth, val, alpha, beta):
+		"""Caches a value found by the search
+
+		Args:
+			key - position key
+			depth - plies searched, or None for an unlimited search
+			val - value found
+			alpha - alpha the position was searched with
+			beta - beta the position was searched with
+
+		Returns:
+			(none)
+
+		Raises:
+			(none)
+		"""
+		if val <= alpha:
+			flag = UPPER_BOUND
+		elif val >= beta:
+			flag = LOWER_BOUND
+		else:
+			flag = EXACT
+
+		self.entries[key] = (depth, val, flag)
+
+class SearchStats(object):
+	"""Statistics collected while an AI player decides on moves
+
+	Attributes:
+		nodes - states visited by the search, leaves included
+		leaves - states scored by the utility function or played out
+		max_depth - deepest ply below the root reached
+		cutoffs - number of alpha-beta cutoffs
+		tt_hits - positions answered from a table instead of searched
+		movegen_time - seconds spent generating moves and successors
+		eval_time - seconds spent in the utility functions
+		elapsed - seconds spent on the decisions in total
+		decisions - number of decisions summed into these statistics
+	"""
+	def __init__(self, nodes=0, leaves=0, max_depth=0, cutoffs=0, tt_hits=0,
+		movegen_time=0.0, eval_time=0.0, elapsed=0.0, decisions=1):
+		super(SearchStats, self).__init__()
+		self.nodes = nodes
+		self.leaves = leaves
+		self.max_depth = max_depth
+		self.cutoffs = cutoffs
+		self.tt_hits = tt_hits
+		self.movegen_time = movegen_time
+		self.eval_time = eval_time
+		self.elapsed = elapsed
+		self.decisions = decisions
+
+	def visit(self, ply):
+		"""Counts a visited state
+
+		Args:
+			ply - number of plies between the root and the state
+
+		Returns:
+			(none)
+
+		Raises:
+			(none)
+		"""
+		self.nodes += 1
+		self.max_depth = max(self.max_depth, ply)
+
+	def add(self, other):
+		"""Sums another set of statistics into this one
+
+		Args:
+			other - SearchStats to add
+
+		Returns:
+			(none)
+
+		Raises:
+			(none)
+		"""
+		self.nodes += other.nodes
+		self.leaves += other.leaves
+		self.max_depth = max(self.max_depth, other.max_depth)
+		self.cutoffs += other.cutoffs
+		self.tt_hits += other.tt_hits
+		self.movegen_time += other.movegen_time
+		self.eval_time += other.eval_time
+		self.elapsed += other.elapsed
+		self.decisions += other.decisions
+
+	def branching_factor(self):
+		"""Effective branching factor of the search
+
+		The branching factor b of a uniform tree of depth max_depth holding
+		as many nodes per decision as were visited.
+
+		Args:
+			(none)
+
+		Returns:
+			the effective branching factor, or 0 with no depth reached
 
-class Move(object):
-	"""Container for a valid move a player may make
+		Raises:
+			(none)
+		"""
+		if self.max_depth == 0 or self.decisions == 0:
+			return 0.0
 
-	Attributes:
-		x - x-coordinate of location to place a piece
-		y - y-coordinate of location to place a piece
-		piece - Piece enum representing player color
-		bounded_pieces - list of tuples of pieces to convert
+		return (self.nodes / self.decisions) ** (1.0 / self.max_depth)
+
+	def to_dict(self):
+		"""Converts the statistics to a dictionary for logging
+
+		Args:
+			(none)
+
+		Returns:
+			dictionary of every attribute and the branching factor
+
+		Raises:
+			(none)
+		"""
+		stats = dict(vars(self))
+		stats["branching_factor"] = self.branching_factor()
+		return stats
+
+def next_depth(depth):
+	"""Depth left to search one ply further down the tree
+
+	Args:
+		depth - plies left to search, or None for an unlimited search
+
+	Returns:
+		depth minus one, or None if the search is unlimited
+
+	Raises:
+		(none)
 	"""
-	def __init__(self, x, y, piece, bounded_pieces):
-		super(Move, self).__init__()
-		self.x = x
-		self.y = y
-		self.piece = piece
-		self.bounded_pieces = bounded_pieces
-			
+	return None if depth is None else depth - 1
+
+def opponent(piece):
+	"""Returns the Piece enum of the other player
+
+	Args:
+		piece - Piece enum of a player
+
+	Returns:
+		the opposing Piece enum
+
+	Raises:
+		(none)
+	"""
+	return Piece.WHITE if piece == Piece.BLACK else Piece.BLACK
+
+@functools.lru_cache(maxsize=None)
+def ray_table(height, width):
+	"""Squares reachable from every square of a board in each direction
+
+	Args:
+		height - height of the board
+		width - width of the board
+
+	Returns:
+		nested list where [x][y] is a dictionary from each (dx, dy)
+		direction with at least one square before the edge to the tuple of
+		(x, y) squares along that ray, nearest first
+
+	Raises:
+		(none)
+	"""
+	rays = [[{} for y in range(width)] for x in range(height)]
+	for x in range(height):
+		for y in range(width):
+			for dx, dy in DIRECTIONS:
+
+				ray = []
+				i, j = x + dx, y + dy
+				while 0 <= i < height and 0 <= j < width:
+					ray.append((i, j))
+					i, j = i + dx, j + dy
+
+				if len(ray) > 0:
+					rays[x][y][(dx, dy)] = tuple(ray)
+
+	return rays
+
+@functools.lru_cache(maxsize=None)
+def line_table(height, width):
+	"""Lines of squares passing through every square of a board
+
+	Args:
+		height - height of the board
+		width - width of the board
+
+	Returns:
+		nested list where [x][y] is a 4-tuple of the row, column, diagonal
+		and anti-diagonal through (x, y), each a tuple of (x, y) squares
+
+	Raises:
+		(none)
+	"""
+	rays = ray_table(height, width)
+	lines = [[None] * width for x in range(height)]
+	for x in range(height):
+		for y in range(width):
+
+			# a line is both opposite rays joined through the square
+			lines[x][y] = tuple(
+				tuple(reversed(rays[x][y].get((-dx, -dy), ()))) + ((x, y),)
+				+ rays[x][y].get((dx, dy), ())
+				for dx, dy in ((0, 1), (1, 0), (1, 1), (1, -1)))
+
+	return lines
+
+@functools.lru_cache(maxsize=None)
+def line_index_table(height, width):
+	"""Numbers the distinct lines of a board for the filled-line counters
+
+	Args:
+		height - height of the board
+		width - width of the board
+
+	Returns:
+		3-tuple of the list of lines (each a tuple of (x, y) squares), a
+		nested list where [x][y] is the 4-tuple of line numbers through
+		(x, y), and a numpy array of the number of squares in each line
+
+	Raises:
+		(none)
+	"""
+	lines = []
+	numbers = {}
+	square_lines = [[None] * width for x in range(height)]
+	for x in range(height):
+		for y in range(width):
+
+			ids = []
+			for line in line_table(height, width)[x][y]:
+				if line not in numbers:
+					numbers[line] = len(lines)
+					lines.append(line)
+				ids.append(numbers[line])
+
+			square_lines[x][y] = tuple(ids)
+
+	return lines, square_lines, np.array([len(line) for line in lines])
+
+# move generation and stability tables for the common board sizes
+for size in TABLE_SIZES:
+	line_index_table(size, size)
+
+@functools.lru_cache(maxsize=None)
+def flat_ray_table(height, width):
+	"""Ray table indexed by flat square number for playout boards
+
+	Args:
+		height - height of the board
+		width - width of the board
+
+	Returns:
+		list where [square] is a tuple of rays leaving the square, each a
+		tuple of flat square numbers nearest first
+
+	Raises:
+		(none)
+	"""
+	rays = ray_table(height, width)
+	return [tuple(tuple(i * width + j for i, j in ray)
+		for ray in rays[x][y].values())
+		for x in range(height) for y in range(width)]
+
+def fast_valid_moves(cells, player, rays):
+	"""Collects the valid moves on a flat playout board
+
+	Args:
+		cells - flat sequence of the board, 1 for X, -1 for O, 0 for empty
+		player - 1 for X, -1 for O
+		rays - flat ray table of the board size
+
+	Returns:
+		list of (square, flips) 2-tuples, flips being a list of squares
+
+	Raises:
+		(none)
+	"""
+	moves = []
+	for square in range(len(cells)):
+
+		if cells[square] != 0:
+			continue
+
+		flips = []
+		for ray in rays[square]:
+
+			run = []
+			for i in ray:
+				if cells[i] != -player:
+					if cells[i] == player:
+						flips += run
+					break
+				run.append(i)
+
+		if len(flips) > 0:
+			moves.append((square, flips))
+
+	return moves
+
+def fast_make_move(cells, player, square, flips):
+	"""Applies a move to a flat playout board in place
+
+	Args:
+		cells - flat list of the board
+		player - 1 for X, -1 for O
+		square - flat square the piece is placed on
+		flips - list of flat squares to convert
+
+	Returns:
+		(none)
+
+	Raises:
+		(none)
+	"""
+	cells[square] = player
+	for i in flips:
+		cells[i] = player
+
+def shift_squares(squares, dx, dy):
+	"""Shifts a stack of boolean boards by a direction
+
+	Args:
+		squares - N x height x width boolean numpy array
+		dx - rows to look ahead by
+		dy - columns to look ahead by
+
+	Returns:
+		boolean array where [n, x, y] holds squares[n, x+dx, y+dy], or
+		False when that square is off the board
+
+	Raises:
+		(none)
+	"""
+	out = np.zeros_like(squares)
+	height, width = squares.shape[1:]
+	out[:, max(-dx, 0):height - max(dx, 0), max(-dy, 0):width - max(dy, 0)] \
+		= squares[:, max(dx, 0):height + min(dx, 0),
+			max(dy, 0):width + min(dy, 0)]
+
+	return out
+
+def count_valid_moves(own, opp):
+	"""Counts the valid moves of a player on a stack of boards
+
+	Args:
+		own - N x height x width boolean array of the player's pieces
+		opp - boolean array of the opponent's pieces
+
+	Returns:
+		numpy array with the number of valid moves on each board
+
+	Raises:
+		(none)
+	"""
+	empty = ~(own | opp)
+	valid = np.zeros_like(own)
+	for dx in (-1, 0, 1):
+		for dy in (-1, 0, 1):
+
+			if dx == 0 and dy == 0:
+				continue
+
+			# extend a run of opponent pieces until one of ours bounds it
+			run = shift_squares(opp, dx, dy)
+			for k in range(2, max(own.shape[1:])):
+				valid |= empty & run & shift_squares(own, k * dx, k * dy)
+				run = run & shift_squares(opp, k * dx, k * dy)
+
+	return valid.sum(axis=(1, 2))
+
+@functools.lru_cache(maxsize=None)
+def diagonal_masks(height, width):
+	"""Square membership matrices of a board's diagonals
+
+	Args:
+		height - height of the board
+		width - width of the board
+
+	Returns:
+		2-tuple of (height*width) x (height+width-1) int arrays, marking
+		the squares on each diagonal (indexed by x-y+width-1) and each
+		anti-diagonal (indexed by x+y)
+
+	Raises:
+		(none)
+	"""
+	x, y = np.indices((height, width))
+	lines = np.arange(height + width - 1)
+	diag = (x - y + width - 1).reshape(-1, 1) == lines
+	anti_diag = (x + y).reshape(-1, 1) == lines
+
+	return diag.astype(np.int64), anti_diag.astype(np.int64)
+
+# Bound shared by the processes of a parallel root search, set up by
+# init_search_worker in every pool process
+search_bound = None
+search_game = None
+
+def init_search_worker(bound, width, height):
+	"""Pool initializer storing the shared bound for search_root_move
+
+	Args:
+		bound - multiprocessing.Value holding the best root value so far
+		width - width of the board being searched
+		height - height of the board being searched
+
+	Returns:
+		(none)
+
+	Raises:
+		(none)
+	"""
+	global search_bound, search_game
+	search_bound = bound
+	search_game = GameDriver(1, 1, width, height)
+
+def search_root_move(task):
+	"""Searches a single root move inside a pool process
+
+	The best root value found so far by any process is read before the
+	search starts and used as the alpha (or beta) bound, so moves searched
+	later can be pruned against it.  Any improvement is published back.
+
+	Args:
+		task - 3-tuple of the root child state, the root player's Piece
+			and the depth left below the root move
+
+	Returns:
+		3-tuple of the value found, the bound it was searched against and
+		the SearchStats of the search
+
+	Raises:
+		(none)
+	"""
+	state, piece, depth = task
+	search_game.stats = SearchStats(decisions=0)
+
+	with search_bound.get_lock():
+		window = search_bound.value
+
+	if piece == Piece.BLACK:
+		val = search_game.min_value(state, window, np.inf, depth)
+	else:
+		val = search_game.max_value(state, -np.inf, window, depth)
+
+	with search_bound.get_lock():
+		if (piece == Piece.BLACK and val > search_bound.value) \
+			or (piece == Piece.WHITE and val < search_bound.value):
+			search_bound.value = val
+
+	return val, window, search_game.stats
+
+def parallel_root_search(game_board, piece, depth, workers):
+	"""Splits the root moves of a search across a process pool
+
+	Values returned from searches that were pruned against a shared bound
+	are only bounds themselves, so any earlier move which might tie with
+	the best value is searched again with a full window.  This makes the
+	selected move identical to the one GameDriver.root_search returns.
+
+	Args:
+		game_board - game state of the AI player's turn
+		piece - Piece enum corresponding to AI player's color
+		depth - number of plies to search, or None for the full game
+		workers - number of processes to use
+
+	Returns:
+		3-tuple of the best utility, the first move reaching it and the
+		SearchStats summed over every process
+
+	Raises:
+		(none)
+	"""
+	height, width = game_board.grid.shape
+	game = GameDriver(1, 1, width, height)
+	game.stats.nodes += 1
+	children = game.search_successors(game_board, piece)
+	if len(children) == 0:
+		return game.utility(game_board), None, game.stats
+
+	sign = 1 if piece == Piece.BLACK else -1
+	bound = multiprocessing.Value("d", -sign * np.inf)
+	tasks = [(state, piece, next_depth(depth)) for move, state in children]
+
+	with multiprocessing.Pool(min(workers, len(tasks)), init_search_worker,
+		(bound, width, height)) as pool:
+		results = pool.map(search_root_move, tasks, chunksize=1)
+
+	for val, window, searched in results:
+		game.stats.add(searched)
+
+	# values strictly inside their window are exact
+	best_val = max(sign * val for val, window, searched in results
+		if sign * val > sign * window or np.isinf(window))
+
+	for (move, state), (val, window, searched) in zip(children, results):
+
+		if sign * val > sign * window or np.isinf(window):
+			if sign * val == best_val:
+				return val, move, game.stats
+
+		# a pruned search only shows this move is no better than the best
+		elif sign * val == best_val:
+			if piece == Piece.BLACK:
+				val = game.min_value(state, depth=next_depth(depth))
+			else:
+				val = game.max_value(state, depth=next_depth(depth))
+
+			if sign * val == best_val:
+				return val, move, game.stats
+
+@functools.lru_cache(maxsize=None)
+def symmetry_permutations(height, width):
+	"""Square index permutations for the symmetries of a board
+
+	Applying a permutation as grid.ravel()[perm] gives the flattened grid
+	rotated and/or reflected.  Square boards have 8 symmetries, other
+	boards only the 4 which keep their shape.  The identity is always
+	first.
+
+	Args:
+		height - height of the board
+		width - width of the board
+
+	Returns:
+		read-only 8 (or 4) x height*width numpy array of flat square indices
+
+	Raises:
+		(none)
+	"""
+	idx = np.arange(height * width).reshape(height, width)
+	perms = []
+	for grid in (idx, idx.T):
+		for k in range(4):
+			rotated = np.rot90(grid, k)
+			if rotated.shape == idx.shape:
+				perms.append(rotated.ravel())
+
+	perms = np.array(perms)
+	perms.flags.writeable = False
+	return perms
+
+def canonical_key(game_board, piece):
+	"""Encodes a position identically for all of its symmetric copies
+
+	Squares are read as digits (0 empty, 1 X, 2 O) in row order and the
+	canonical form is the lexicographically smallest digit string among
+	the symmetric copies of the board, followed by the player to move.
+	Transposition tables keyed on it share entries between symmetric
+	positions, which always have the same value.
+
+	Args:
+		game_board - Board object to encode
+		piece - Piece enum of the player to move
+
+	Returns:
+		2-tuple of the canonical key as bytes and the permutation producing
+		it
+
+	Raises:
+		(none)
+	"""
+	flat = game_board.grid.ravel()
+	cells = (flat == "X").view(np.uint8) + (flat == "O").view(np.uint8) * 2
+
+	perms = symmetry_permutations(*game_board.grid.shape)
+	codes = cells[perms].tobytes()
+	n = cells.size
+	keys = [codes[i:i + n] for i in range(0, len(codes), n)]
+
+	# the first of equal copies, as np.argmin would choose
+	best = keys.index(min(keys))
+	return keys[best] + bytes((piece.value,)), perms[best]
+
+def canonical_position(game_board, piece):
+	"""Encodes a position in the canonical form used by the solved table
+
+	Squares are read as base-3 digits (0 empty, 1 X, 2 O) and the player to
+	move is appended as the lowest bit.  The canonical form is the smallest
+	encoding among the symmetric copies of the board, which is the copy
+	chosen by canonical_key since the digit strings have equal length.
+
+	Args:
+		game_board - Board object to encode
+		piece - Piece enum of the player to move
+
+	Returns:
+		2-tuple of the canonical key and the permutation producing it
+
+	Raises:
+		(none)
+	"""
+	key, perm = canonical_key(game_board, piece)
+
+	val = 0
+	for digit in key[:-1]:
+		val = val * 3 + digit
+
+	return val * 2 + piece.value, perm
+
+def load_solved_table(fn):
+	"""Memory-maps the solved table written by solve4x4.py
+
+	Args:
+		fn - filename of the table
+
+	Returns:
+		structured numpy array of key, value and move sorted by key, or
+		None if the table has not been generated
+
+	Raises:
+		(none)
+	"""
+	if not os.path.exists(fn):
+		return None
+
+	return np.load(fn, mmap_mode="r")
+
+def solved_lookup(table, game_board, piece):
+	"""Looks up the perfect-play value and move of a position
+
+	Args:
+		table - solved table returned by load_solved_table
+		game_board - Board object to look up
+		piece - Piece enum of the player to move
+
+	Returns:
+		None if the position is not in the table, otherwise a 2-tuple of
+		the final piece differential (X minus O) under perfect play and
+		the (x, y) of the best move, or None if the player must pass
+
+	Raises:
+		(none)
+	"""
+	key, perm = canonical_position(game_board, piece)
+	i = np.searchsorted(table["key"], key)
+	if i == len(table) or table["key"][i] != key:
+		return None
+
+	value = int(table["value"][i])
+	square = int(table["move"][i])
+	if square == NO_MOVE:
+		return value, None
+
+	# the move is stored for the canonical board, map it back
+	return value, divmod(int(perm[square]), game_board.grid.shape[1])
+
+SOLVED_TABLE = load_solved_table(SOLVED_TABLE_FNAME)
+
 def main():
 	
+	# pondering can be switched on anywhere on the command line
+	ponder = "--ponder" in sys.argv
+	if ponder:
+		sys.argv.remove("--ponder")
+
+	# as can recording the game, followed by the file to append it to
+	record_fn = None
+	if "--record" in sys.argv:
+
+		i = sys.argv.index("--record")
+		record_fn = sys.argv[i + 1]
+		del sys.argv[i:i + 2]
+
 	max_player = 0 if sys.argv[1] == "human" else 1
 	min_player = 0 if sys.argv[2] == "human" else 1
+	if sys.argv[1] == "mcts":
+		max_player = MCTSPlayer("X")
+	if sys.argv[2] == "mcts":
+		min_player = MCTSPlayer("O")
+	size = int(sys.argv[3]) if len(sys.argv) > 3 else BOARD_WIDTH
+	stats_log = open(sys.argv[4], "a") if len(sys.argv) > 4 else None
+
+	recorder = None
+	if record_fn is not None:
+
+		# gamerecord replays games with this module, so import it late
+		import gamerecord
 
-	game = GameDriver(max_player, min_player)
+		gamerecord.check_board_size(size, size)
+		recorder = gamerecord.GameRecordWriter(record_fn)
+
+	game = GameDriver(max_player, min_player, size, size,
+		stats_log=stats_log, ponder=ponder, recorder=recorder)
 	print_game_message(
 		"New Othello game beginning with {} player as X's and {} player as O's".format(
 			sys.argv[1], sys.argv[2]))
@@ -701,6 +2232,16 @@ def main():
 
 	print_game_message("Game has ended.  {}!".format(game.result))
 
+	if game.game_stats.decisions > 0:
+		print_game_message("Search statistics: {}".format(
+			json.dumps(game.game_stats.to_dict())))
+
+	if stats_log is not None:
+		stats_log.close()
+
+	if recorder is not None:
+		recorder.close()
+
 def print_game_message(message):
 	"""Helper function for pretty printing of text messages
 
@@ -0,0 +1,198 @@
+import argparse
+import copy
+import sys
+import time
+
+import PA2
+
+
+# Constants
+# Leaf counts from the standard starting position.  The 8x8 counts are the
+# published Othello perft values, the others were recorded from Board and
+# agree with the independent flat move generator used by MCTS playouts.
+KNOWN_PERFT = {
+	4: [1, 4, 12, 44, 128, 424, 1256, 3624, 9116, 20044, 36540],
+	6: [1, 4, 12, 56, 244, 1364, 7604, 47740, 308716],
+	8: [1, 4, 12, 56, 244, 1396, 8200, 55092, 390216],
+}
+DEFAULT_DEPTHS = {4: 8, 6: 5, 8: 5}
+
+
+def main():
+
+	parser = argparse.ArgumentParser(
+		description="Perft and timing benchmark for the Othello core")
+	parser.add_argument("-s", "--size", type=int, nargs="*",
+		default=sorted(KNOWN_PERFT),
+		help="board sizes to benchmark")
+	parser.add_argument("-d", "--depth", type=int, default=None,
+		help="perft depth (default depends on the board size)")
+	args = parser.parse_args()
+
+	correct = True
+	for size in args.size:
+
+		depth = args.depth if args.depth is not None \
+			else DEFAULT_DEPTHS.get(size, 4)
+		correct = run_benchmark(size, depth) and correct
+
+	sys.exit(0 if correct else 1)
+
+def perft(game, game_board, piece, depth, positions=None):
+	"""Counts the leaf nodes of the game tree to a fixed depth
+
+	A player without moves passes, which uses up a ply.  Positions where
+	neither player can move are counted as leaves.
+
+	Args:
+		game - GameDriver used for move generation
+		game_board - Board object to count from
+		piece - Piece enum of the player to move
+		depth - plies to count to
+		positions - optional list collecting every (board, piece) visited
+
+	Returns:
+		the number of leaf nodes
+
+	Raises:
+		(none)
+	"""
+	if positions is not None:
+		positions.append((game_board, piece))
+
+	if depth == 0:
+		return 1
+
+	valid_moves = game.collect_valid_moves(game_board, piece)
+	if len(valid_moves) == 0:
+
+		if len(game.collect_valid_moves(game_board,
+			PA2.opponent(piece))) == 0:
+			return 1
+
+		return perft(game, game_board, PA2.opponent(piece), depth - 1,
+			positions)
+
+	nodes = 0
+	for move, state in game.successors(game_board, piece):
+		nodes += perft(game, state, PA2.opponent(piece), depth - 1, positions)
+
+	return nodes
+
+def flat_perft(cells, player, depth, rays):
+	"""perft on the flat playout board used by MCTSPlayer
+
+	Args:
+		cells - flat list of the board
+		player - 1 if X is to move, -1 if O is
+		depth - plies to count to
+		rays - flat ray table of the board size
+
+	Returns:
+		the number of leaf nodes
+
+	Raises:
+		(none)
+	"""
+	if depth == 0:
+		return 1
+
+	moves = PA2.fast_valid_moves(cells, player, rays)
+	if len(moves) == 0:
+
+		if len(PA2.fast_valid_moves(cells, -player, rays)) == 0:
+			return 1
+
+		return flat_perft(cells, -player, depth - 1, rays)
+
+	nodes = 0
+	for square, flips in moves:
+
+		child = list(cells)
+		PA2.fast_make_move(child, player, square, flips)
+		nodes += flat_perft(child, -player, depth - 1, rays)
+
+	return nodes
+
+def time_operation(operation, args_list):
+	"""Times a function over a list of argument tuples
+
+	Args:
+		operation - function to call
+		args_list - list of argument tuples, one per call
+
+	Returns:
+		2-tuple of the elapsed seconds and the calls per second
+
+	Raises:
+		(none)
+	"""
+	start = time.perf_counter()
+	for args in args_list:
+		operation(*args)
+
+	elapsed = time.perf_counter() - start
+	return elapsed, len(args_list) / elapsed if elapsed > 0 else float("inf")
+
+def run_benchmark(size, depth):
+	"""Runs perft and per-operation timings for one board size
+
+	Args:
+		size - width and height of the board
+		depth - perft depth
+
+	Returns:
+		True if every perft count matched its known value
+
+	Raises:
+		(none)
+	"""
+	game = PA2.GameDriver(1, 1, size, size, quiet=True)
+	known = KNOWN_PERFT.get(size, [])
+	print("{0}x{0} board".format(size))
+
+	# perft counts, checked against the known values and the flat generator
+	correct = True
+	positions = []
+	rays = PA2.flat_ray_table(size, size)
+	cells = game.board.to_array().ravel().tolist()
+	for d in range(1, depth + 1):
+
+		positions = []
+		start = time.perf_counter()
+		nodes = perft(game, game.board, PA2.Piece.BLACK, d, positions)
+		elapsed = time.perf_counter() - start
+
+		flat_nodes = flat_perft(cells, 1, d, rays)
+		expected = known[d] if d < len(known) else None
+		ok = nodes == flat_nodes and (expected is None or nodes == expected)
+		correct = correct and ok
+
+		print("  perft({})\t{:>10}\t{:>10.0f} nodes/sec\t{}".format(d, nodes,
+			len(positions) / elapsed, "ok" if ok else "MISMATCH (flat {}, "
+			"expected {})".format(flat_nodes, expected)))
+
+	# time each core operation over every position visited by the last perft
+	moves = [(game_board, piece, game.collect_valid_moves(game_board, piece))
+		for game_board, piece in positions]
+	timings = [
+		("collect_valid_moves", game.collect_valid_moves,
+			[(game_board, piece) for game_board, piece in positions]),
+		("make_move", PA2.Board.make_move,
+			[(copy.deepcopy(game_board), move)
+				for game_board, piece, valid in moves for move in valid]),
+		("successors", game.successors,
+			[(game_board, piece) for game_board, piece in positions]),
+		("utility", game.utility,
+			[(game_board,) for game_board, piece in positions]),
+	]
+
+	for name, operation, args_list in timings:
+		elapsed, rate = time_operation(operation, args_list)
+		print("  {:<20}\t{:>8} calls\t{:>8.3f}s\t{:>10.0f} calls/sec".format(
+			name, len(args_list), elapsed, rate))
+
+	return correct
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,264 @@
+import json
+import sys
+import threading
+import time
+
+import numpy as np
+
+import PA2
+
+
+# Constants
+DEFAULT_DEPTH = 4
+EMPTY_CHARS = ".- "
+
+
+class Engine(object):
+	"""Othello engine driven by a line-based text protocol
+
+	Commands, one per line:
+		size W [H]            start a new game on a W x H board
+		newgame               reset to the starting position
+		position CELLS SIDE   set the board row by row from X, O and . (or
+		                      -) characters and the side to move, X or O
+		play X Y | play pass  make a move for the side to move
+		go [depth N | time MS]
+		                      search the position and answer with an info
+		                      line of statistics and a bestmove line
+		quit                  exit the engine
+
+	Every other command is answered with ok, or with error and a reason.
+
+	Attributes:
+		game - quiet GameDriver holding the current board
+		piece - Piece enum of the side to move
+		transpositions - TranspositionTable kept across searches
+	"""
+	def __init__(self, width=PA2.BOARD_WIDTH, height=PA2.BOARD_HEIGHT):
+		super(Engine, self).__init__()
+		self.new_game(width, height)
+
+	def new_game(self, width, height):
+		"""Resets the engine to the starting position of a board size
+
+		Args:
+			width - width of the board
+			height - height of the board
+
+		Returns:
+			(none)
+
+		Raises:
+			(none)
+		"""
+		self.game = PA2.GameDriver(1, 1, width, height, quiet=True)
+		self.piece = PA2.Piece.BLACK
+		self.transpositions = PA2.TranspositionTable()
+
+	def handle(self, line):
+		"""Runs a single protocol command
+
+		Args:
+			line - command line read from the input
+
+		Returns:
+			list of response lines, or None if the engine should exit
+
+		Raises:
+			(none)
+		"""
+		words = line.split()
+		if len(words) == 0:
+			return []
+
+		command, args = words[0], words[1:]
+		try:
+			if command == "quit":
+				return None
+			elif command == "size":
+				width = int(args[0])
+				self.new_game(width, int(args[1]) if len(args) > 1 else width)
+			elif command == "newgame":
+				height, width = self.game.board.grid.shape
+				self.new_game(width, height)
+			elif command == "position":
+				self.set_position(args[0], args[1])
+			elif command == "play":
+				self.play(args)
+			elif command == "go":
+				return self.go(args)
+			else:
+				return ["error unknown command '{}'".format(command)]
+
+		except (IndexError, ValueError) as e:
+			return ["error {}".format(e)]
+
+		return ["ok"]
+
+	def set_position(self, cells, side):
+		"""Sets the board and the side to move
+
+		Args:
+			cells - string of height*width X, O or empty characters, row by
+				row
+			side - "X" or "O" for the side to move
+
+		Returns:
+			(none)
+
+		Raises:
+			ValueError if the cells or side are malformed
+		"""
+		grid = self.game.board.grid
+		if len(cells) != grid.size:
+			raise ValueError("expected {} cells, got {}".format(grid.size,
+				len(cells)))
+
+		if side not in ("X", "O"):
+			raise ValueError("side must be X or O")
+
+		cells = [" " if c in EMPTY_CHARS else c for c in cells.upper()]
+		if any(c not in (" ", "X", "O") for c in cells):
+			raise ValueError("cells must be X, O or empty")
+
+		self.game.board.set_grid(np.array(cells).reshape(grid.shape))
+		self.piece = PA2.Piece.BLACK if side == "X" else PA2.Piece.WHITE
+
+	def play(self, args):
+		"""Makes a move for the side to move
+
+		Args:
+			args - ["pass"] or the x and y of the move as strings
+
+		Returns:
+			(none)
+
+		Raises:
+			ValueError if the move is not valid
+		"""
+		valid_moves = self.game.collect_valid_moves(self.game.board,
+			self.piece)
+
+		if args[0] == "pass":
+			if len(valid_moves) > 0:
+				raise ValueError("cannot pass with valid moves available")
+
+		else:
+			square = (int(args[0]), int(args[1]))
+			for move in valid_moves:
+				if (move.x, move.y) == square:
+					self.game.board.make_move(move)
+					break
+			else:
+				raise ValueError("invalid move {} {}".format(*square))
+
+		self.piece = PA2.opponent(self.piece)
+
+	def go(self, args):
+		"""Searches the current position for the side to move
+
+		A depth limit searches to exactly that depth.  A time limit deepens
+		the search one ply at a time and answers with the deepest search
+		finished before the time ran out.
+
+		Args:
+			args - [], ["depth", N] or ["time", MS]
+
+		Returns:
+			list of the info line and the bestmove line
+
+		Raises:
+			ValueError if the limit is malformed or not positive
+		"""
+		depth = DEFAULT_DEPTH
+		time_limit = None
+		if len(args) > 0:
+			if args[0] == "depth":
+				depth = int(args[1])
+				if depth < 1:
+					raise ValueError("depth must be at least 1")
+			elif args[0] == "time":
+				time_limit = int(args[1]) / 1000.0
+				if time_limit <= 0:
+					raise ValueError("time must be at least 1 ms")
+			else:
+				raise ValueError("unknown limit '{}'".format(args[0]))
+
+		if len(self.game.collect_valid_moves(self.game.board, self.piece)) \
+			== 0:
+			return ["info {}".format(json.dumps(PA2.SearchStats().to_dict())),
+				"bestmove pass"]
+
+		if time_limit is None:
+			move, stats = self.game.minimax_decision(self.game.board,
+				self.piece, depth, 1, self.transpositions)
+
+		else:
+			move, stats = self.iterative_deepening(time_limit)
+
+		return ["info {}".format(json.dumps(stats.to_dict())),
+			"bestmove {} {}".format(move.x, move.y)]
+
+	def iterative_deepening(self, time_limit):
+		"""Deepens the search until the time limit is reached
+
+		Args:
+			time_limit - seconds available for the search
+
+		Returns:
+			2-tuple of the move from the deepest finished search and the
+			SearchStats summed over every search
+
+		Raises:
+			(none)
+		"""
+		start = time.perf_counter()
+		stop = threading.Event()
+		timer = threading.Timer(time_limit, stop.set)
+		timer.start()
+		self.game.abort = stop
+
+		# deeper than the number of empty squares cannot change the result
+		total = PA2.SearchStats(decisions=0)
+		move = None
+		empty = int((self.game.board.grid == " ").sum())
+		try:
+			for depth in range(1, empty + 1):
+
+				move, stats = self.game.minimax_decision(self.game.board,
+					self.piece, depth, 1, self.transpositions)
+				total.add(stats)
+
+		except PA2.SearchAborted:
+			total.add(self.game.stats)
+
+		finally:
+			timer.cancel()
+			self.game.abort = None
+
+		# every search of the deepening counts towards a single decision
+		total.decisions = 1
+
+		# always answer with a move, even if the first ply was cut short
+		if move is None:
+			move = self.game.collect_valid_moves(self.game.board,
+				self.piece)[0]
+
+		total.elapsed = time.perf_counter() - start
+		return move, total
+
+def main():
+
+	engine = Engine()
+	for line in sys.stdin:
+
+		response = engine.handle(line)
+		if response is None:
+			break
+
+		for reply in response:
+			print(reply)
+		sys.stdout.flush()
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,330 @@
+import mmap
+import os
+import random
+import struct
+
+import numpy as np
+
+import PA2
+
+
+# Constants
+MAGIC = b"OTHR"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sB")
+GAME_HEADER = struct.Struct("<BBBBbH")
+PLAYER_CODES = ("HumanPlayer", "MinimaxPlayer", "MCTSPlayer", "RandomPlayer")
+UNKNOWN_PLAYER = 255
+# squares must stay below PA2.NO_MOVE and the piece differential must fit
+# the signed result byte
+MAX_SQUARES = 127
+
+
+class GameRecord(object):
+	"""A single game read back from a record file
+
+	Attributes:
+		width - width of the board
+		height - height of the board
+		p1 - player code of the X player, an index into PLAYER_CODES
+		p2 - player code of the O player
+		result - final piece differential, X minus O
+		moves - numpy uint8 array of flat squares played, PA2.NO_MOVE for
+			a skipped turn; a view into the memory-mapped file
+	"""
+	def __init__(self, width, height, p1, p2, result, moves):
+		super(GameRecord, self).__init__()
+		self.width = width
+		self.height = height
+		self.p1 = p1
+		self.p2 = p2
+		self.result = result
+		self.moves = moves
+
+	def positions(self):
+		"""Replays the game, yielding every position before each move
+
+		Args:
+			(none)
+
+		Returns:
+			generator of 3-tuples of the flat board as a list (1 for X, -1
+			for O, 0 for empty), the player to move (1 or -1) and the
+			square they played or PA2.NO_MOVE
+
+		Raises:
+			ValueError if a recorded move is not valid
+		"""
+		rays = PA2.flat_ray_table(self.height, self.width)
+		cells = PA2.Board(self.width, self.height).to_array().ravel().tolist()
+		player = 1
+
+		for square in self.moves.tolist():
+
+			yield list(cells), player, square
+
+			if square != PA2.NO_MOVE:
+				for move, flips in PA2.fast_valid_moves(cells, player, rays):
+					if move == square:
+						PA2.fast_make_move(cells, player, square, flips)
+						break
+				else:
+					raise ValueError("Invalid move {} in record.".format(
+						square))
+
+			player = -player
+
+class GameRecordWriter(object):
+	"""Appends games to a compact binary record file
+
+	The file starts with MAGIC and a version byte.  Each game is a header
+	of board width and height, the two player codes, the signed result and
+	the number of moves, followed by one byte per move.
+
+	Attributes:
+		f - binary file object the games are appended to
+	"""
+	def __init__(self, fn):
+		super(GameRecordWriter, self).__init__()
+		new_file = not os.path.exists(fn) or os.path.getsize(fn) == 0
+		self.f = open(fn, "ab")
+
+		if new_file:
+			self.f.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+	def write(self, width, height, p1, p2, result, moves):
+		"""Appends a single game to the file
+
+		Args:
+			width - width of the board
+			height - height of the board
+			p1 - player code of the X player
+			p2 - player code of the O player
+			result - final piece differential, X minus O
+			moves - list of flat squares played, PA2.NO_MOVE for a pass
+
+		Returns:
+			(none)
+
+		Raises:
+			ValueError if the board is too large for the format
+		"""
+		check_board_size(width, height)
+		self.f.write(GAME_HEADER.pack(width, height, p1, p2, result,
+			len(moves)))
+		self.f.write(bytes(moves))
+
+	def write_game(self, game):
+		"""Appends a finished game played by a GameDriver
+
+		Args:
+			game - GameDriver of the finished game
+
+		Returns:
+			(none)
+
+		Raises:
+			(none)
+		"""
+		height, width = game.board.grid.shape
+		p1_s, p2_s = game.score()
+		self.write(width, height, player_code(game.p1), player_code(game.p2),
+			p1_s - p2_s, game.moves)
+
+	def close(self):
+		"""Closes the record file
+
+		Args:
+			(none)
+
+		Returns:
+			(none)
+
+		Raises:
+			(none)
+		"""
+		self.f.close()
+
+class GameRecordReader(object):
+	"""Memory-mapped random access to the games of a record file
+
+	The game offsets are found with a single pass over the headers when
+	the file is opened; move bytes are never copied until used.
+
+	Attributes:
+		f - binary file object of the record file
+		data - read-only mmap of the file
+		offsets - numpy array of the byte offset of every game header
+	"""
+	def __init__(self, fn):
+		super(GameRecordReader, self).__init__()
+		self.f = open(fn, "rb")
+		self.data = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+
+		magic, version = FILE_HEADER.unpack_from(self.data, 0)
+		if magic != MAGIC or version != VERSION:
+			raise ValueError("{} is not a version {} game record file.".format(
+				fn, VERSION))
+
+		offsets = []
+		offset = FILE_HEADER.size
+		while offset + GAME_HEADER.size <= len(self.data):
+
+			# a game cut short by an interrupted write is ignored
+			end = offset + GAME_HEADER.size \
+				+ GAME_HEADER.unpack_from(self.data, offset)[5]
+			if end > len(self.data):
+				break
+
+			offsets.append(offset)
+			offset = end
+
+		self.offsets = np.array(offsets, dtype=np.int64)
+
+	def __len__(self):
+		return len(self.offsets)
+
+	def __getitem__(self, i):
+		"""Reads the i-th game of the file
+
+		Args:
+			i - index of the game
+
+		Returns:
+			a GameRecord whose moves are a view into the file
+
+		Raises:
+			IndexError if there is no such game
+		"""
+		offset = int(self.offsets[i])
+		width, height, p1, p2, result, num_moves = GAME_HEADER.unpack_from(
+			self.data, offset)
+		moves = np.frombuffer(self.data, dtype=np.uint8, count=num_moves,
+			offset=offset + GAME_HEADER.size)
+
+		return GameRecord(width, height, p1, p2, result, moves)
+
+	def __iter__(self):
+		for i in range(len(self)):
+			yield self[i]
+
+	def results(self):
+		"""Reads the result of every game without touching the moves
+
+		Args:
+			(none)
+
+		Returns:
+			numpy int array of the X minus O piece differentials
+
+		Raises:
+			(none)
+		"""
+		return np.array([GAME_HEADER.unpack_from(self.data, int(offset))[4]
+			for offset in self.offsets], dtype=np.int64)
+
+	def sample_positions(self, n, seed=None):
+		"""Draws random positions from random games
+
+		Args:
+			n - number of positions to draw
+			seed - seed for the random choices
+
+		Returns:
+			list of 4-tuples of the flat board, the player to move, the move
+			they played and the game's final result
+
+		Raises:
+			(none)
+		"""
+		rng = random.Random(seed)
+		samples = []
+		for i in range(n):
+
+			game = self[rng.randrange(len(self))]
+			ply = rng.randrange(len(game.moves))
+			for j, position in enumerate(game.positions()):
+				if j == ply:
+					samples.append(position + (game.result,))
+					break
+
+		return samples
+
+	def opening_stats(self, plies):
+		"""Tallies the results of every opening sequence
+
+		Args:
+			plies - length of the opening sequences
+
+		Returns:
+			dictionary from a tuple of the first moves to a list of the
+			number of games, X wins, O wins and draws
+
+		Raises:
+			(none)
+		"""
+		stats = {}
+		for game in self:
+
+			tally = stats.setdefault(tuple(game.moves[:plies].tolist()),
+				[0, 0, 0, 0])
+			tally[0] += 1
+			if game.result > 0:
+				tally[1] += 1
+			elif game.result < 0:
+				tally[2] += 1
+			else:
+				tally[3] += 1
+
+		return stats
+
+	def close(self):
+		"""Closes the file
+
+		The mapping itself is released once no GameRecord moves still view
+		into it.
+
+		Args:
+			(none)
+
+		Returns:
+			(none)
+
+		Raises:
+			(none)
+		"""
+		self.data = None
+		self.f.close()
+
+def check_board_size(width, height):
+	"""Checks that games on a board can be stored in a record file
+
+	Args:
+		width - width of the board
+		height - height of the board
+
+	Returns:
+		(none)
+
+	Raises:
+		ValueError if the board has more than MAX_SQUARES squares
+	"""
+	if width * height > MAX_SQUARES:
+		raise ValueError("{}x{} boards are too large to record, at most {} "
+			"squares are supported.".format(width, height, MAX_SQUARES))
+
+def player_code(player):
+	"""Code stored for a Player object in game headers
+
+	Args:
+		player - Player object
+
+	Returns:
+		index of the player's class name in PLAYER_CODES, or UNKNOWN_PLAYER
+
+	Raises:
+		(none)
+	"""
+	name = type(player).__name__
+	return PLAYER_CODES.index(name) if name in PLAYER_CODES \
+		else UNKNOWN_PLAYER
@@ -0,0 +1,105 @@
+import copy
+import sys
+import time
+
+import numpy as np
+
+import PA2
+
+
+# Constants
+TABLE_DTYPE = np.dtype([("key", "<u4"), ("value", "i1"), ("move", "u1")])
+
+
+def main():
+
+	fn = sys.argv[1] if len(sys.argv) > 1 else PA2.SOLVED_TABLE_FNAME
+
+	print("Solving 4x4 Othello...")
+	start = time.perf_counter()
+	game = PA2.GameDriver(1, 1, quiet=True)
+	solved = {}
+	value = solve(game, game.board, PA2.Piece.BLACK, solved)
+	print("Solved {} canonical positions in {:.2f}s, start value {}".format(
+		len(solved), time.perf_counter() - start, value))
+
+	write_table(fn, solved)
+	print("Table written to {}".format(fn))
+
+def solve(game, game_board, piece, solved):
+	"""Exhaustively computes the perfect-play value of a position
+
+	Unlike the heuristic search a player without moves passes, and the
+	game only ends once neither player can move.  Every position reached
+	is added to solved under its canonical key.
+
+	Args:
+		game - GameDriver used for move generation
+		game_board - Board object of the position to solve
+		piece - Piece enum of the player to move
+		solved - dictionary of canonical key to (value, canonical move)
+
+	Returns:
+		final piece differential (X minus O) under perfect play
+
+	Raises:
+		(none)
+	"""
+	key, perm = PA2.canonical_position(game_board, piece)
+	if key in solved:
+		return solved[key][0]
+
+	valid_moves = game.collect_valid_moves(game_board, piece)
+
+	if len(valid_moves) == 0:
+
+		# the game ends once both players are out of moves
+		if len(game.collect_valid_moves(game_board,
+			PA2.opponent(piece))) == 0:
+			value = int(np.sum(game_board.grid == "X")
+				- np.sum(game_board.grid == "O"))
+		else:
+			value = solve(game, game_board, PA2.opponent(piece), solved)
+
+		solved[key] = (value, PA2.NO_MOVE)
+		return value
+
+	sign = 1 if piece == PA2.Piece.BLACK else -1
+	best_val = None
+	best_move = None
+	for move in valid_moves:
+
+		state = copy.deepcopy(game_board)
+		state.make_move(move)
+		val = solve(game, state, PA2.opponent(piece), solved)
+
+		if best_val is None or sign * val > sign * best_val:
+			best_val = val
+			best_move = move
+
+	# store the move as a square of the canonical board
+	square = best_move.x * game_board.grid.shape[1] + best_move.y
+	solved[key] = (best_val, int(np.argsort(perm)[square]))
+	return best_val
+
+def write_table(fn, solved):
+	"""Writes solved positions as a key-sorted table for memory-mapping
+
+	Args:
+		fn - filename to write the table to
+		solved - dictionary of canonical key to (value, canonical move)
+
+	Returns:
+		(none)
+
+	Raises:
+		(none)
+	"""
+	table = np.zeros(len(solved), dtype=TABLE_DTYPE)
+	for i, key in enumerate(sorted(solved)):
+		table[i] = (key,) + solved[key]
+
+	np.save(fn, table)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,212 @@
+import argparse
+import multiprocessing
+import random
+import time
+
+import PA2
+import gamerecord
+
+
+# Constants
+DEFAULT_GAMES = 20
+DEFAULT_ENGINE = "minimax:2"
+
+
+def main():
+
+	parser = argparse.ArgumentParser(
+		description="Plays headless AI-vs-AI Othello games in parallel")
+	parser.add_argument("engine_a", nargs="?", default=DEFAULT_ENGINE,
+		help="engine spec, e.g. minimax:3, minimax (full depth), mcts:500 "
+			"or random")
+	parser.add_argument("engine_b", nargs="?", default=DEFAULT_ENGINE,
+		help="engine spec for the opponent")
+	parser.add_argument("-n", "--games", type=int, default=DEFAULT_GAMES,
+		help="number of games to play")
+	parser.add_argument("-s", "--size", type=int, default=PA2.BOARD_WIDTH,
+		help="width and height of the board")
+	parser.add_argument("-o", "--openings", type=int, default=0,
+		help="number of random plies played before the engines take over")
+	parser.add_argument("-j", "--processes", type=int, default=None,
+		help="number of games played at once (default: every core)")
+	parser.add_argument("--alternate", action="store_true",
+		help="swap colors every other game")
+	parser.add_argument("--seed", type=int, default=0,
+		help="seed for the random openings and random engines")
+	parser.add_argument("--record", default=None,
+		help="game record file every game is appended to")
+	args = parser.parse_args()
+
+	recorder = None
+	if args.record is not None:
+		gamerecord.check_board_size(args.size, args.size)
+		recorder = gamerecord.GameRecordWriter(args.record)
+
+	stats = run_tournament(args.engine_a, args.engine_b, args.games,
+		args.size, args.openings, args.processes, args.alternate, args.seed,
+		recorder)
+	if recorder is not None:
+		recorder.close()
+
+	print_summary(args.engine_a, args.engine_b, stats)
+
+def build_player(spec, token, seed):
+	"""Creates an AI player from an engine spec string
+
+	Engine specs are an engine name optionally followed by a colon and a
+	search depth or number of playouts, e.g. "minimax:3" or "mcts:500".
+	Players never spawn their own process pool since every game already
+	runs inside one.
+
+	Args:
+		spec - engine spec string
+		token - "X" or "O" for the color the player controls
+		seed - seed for engines which make random choices
+
+	Returns:
+		a Player object
+
+	Raises:
+		ValueError if the engine name is unknown
+	"""
+	name, _, param = spec.partition(":")
+
+	if name == "minimax":
+		depth = int(param) if param else None
+		return PA2.MinimaxPlayer(token, depth, workers=1)
+
+	elif name == "mcts":
+		iterations = int(param) if param else None
+		return PA2.MCTSPlayer(token, iterations, seed=seed)
+
+	elif name == "random":
+		return PA2.RandomPlayer(token, seed)
+
+	raise ValueError("Unknown engine '{}'.".format(name))
+
+def play_game(task):
+	"""Plays a single quiet game between two engines
+
+	Args:
+		task - 6-tuple of the black engine spec, the white engine spec, the
+			board size, the number of random opening plies, the game's
+			seed and whether engine A is playing white
+
+	Returns:
+		dictionary with the final score from engine A's point of view, the
+		number of decisions made by searching engines, the states they
+		searched and the game record fields
+
+	Raises:
+		(none)
+	"""
+	spec_x, spec_o, size, openings, seed, swapped = task
+	rng = random.Random(seed)
+
+	game = PA2.GameDriver(build_player(spec_x, "X", rng.random()),
+		build_player(spec_o, "O", rng.random()), size, size, quiet=True)
+
+	# random opening so repeated games between deterministic engines differ
+	order = (1, 2)
+	for ply in range(openings):
+		piece = game.p1.token if order[0] == 1 else game.p2.token
+		valid_moves = game.collect_valid_moves(game.board, piece)
+		if len(valid_moves) == 0:
+			break
+		game.play_move(rng.choice(valid_moves))
+		order = order[::-1]
+
+	while not game.game_over():
+
+		for p_num in order:
+			game.player_move(p_num)
+
+	p1_s, p2_s = game.score()
+	record = (size, size, gamerecord.player_code(game.p1),
+		gamerecord.player_code(game.p2), p1_s - p2_s, game.moves)
+	return {"score": (p2_s, p1_s) if swapped else (p1_s, p2_s),
+		"decisions": game.game_stats.decisions,
+		"nodes": game.game_stats.nodes, "record": record}
+
+def run_tournament(engine_a, engine_b, games, size, openings, processes,
+	alternate, seed, recorder=None):
+	"""Plays a batch of games in a process pool and collects statistics
+
+	Args:
+		engine_a - engine spec of the first engine
+		engine_b - engine spec of the second engine
+		games - number of games to play
+		size - width and height of the board
+		openings - number of random opening plies per game
+		processes - pool size, or None for every core
+		alternate - True to swap colors every other game
+		seed - base seed for the games
+		recorder - GameRecordWriter every finished game is written to, or
+			None
+
+	Returns:
+		dictionary of win/loss/draw counts from engine A's point of view,
+		average nodes per searched move, elapsed time and games per second
+
+	Raises:
+		(none)
+	"""
+	tasks = []
+	for i in range(games):
+
+		swapped = alternate and i % 2 == 1
+		specs = (engine_b, engine_a) if swapped else (engine_a, engine_b)
+		tasks.append(specs + (size, openings, seed + i, swapped))
+
+	stats = {"wins": 0, "losses": 0, "draws": 0, "decisions": 0,
+		"nodes": 0}
+	start = time.perf_counter()
+
+	with multiprocessing.Pool(processes) as pool:
+
+		for res in pool.imap_unordered(play_game, tasks):
+
+			a_s, b_s = res["score"]
+			if a_s > b_s:
+				stats["wins"] += 1
+			elif b_s > a_s:
+				stats["losses"] += 1
+			else:
+				stats["draws"] += 1
+
+			# random players never search, so only searched moves count
+			stats["decisions"] += res["decisions"]
+			stats["nodes"] += res["nodes"]
+
+			# only the parent process writes so records never interleave
+			if recorder is not None:
+				recorder.write(*res["record"])
+
+	stats["elapsed"] = time.perf_counter() - start
+	stats["games_per_sec"] = games / stats["elapsed"]
+	stats["nodes_per_move"] = stats["nodes"] / max(stats["decisions"], 1)
+	return stats
+
+def print_summary(engine_a, engine_b, stats):
+	"""Prints the statistics collected by run_tournament
+
+	Args:
+		engine_a - engine spec of the first engine
+		engine_b - engine spec of the second engine
+		stats - dictionary returned by run_tournament
+
+	Returns:
+		(none)
+
+	Raises:
+		(none)
+	"""
+	print("{} vs {}".format(engine_a, engine_b))
+	print("Wins:\t{}\tLosses:\t{}\tDraws:\t{}".format(
+		stats["wins"], stats["losses"], stats["draws"]))
+	print("Avg nodes per move:\t{:.1f}".format(stats["nodes_per_move"]))
+	print("Games/sec:\t{:.2f}\t({:.2f}s total)".format(
+		stats["games_per_sec"], stats["elapsed"]))
+
+if __name__ == '__main__':
+	main()
@@ -1,6 +1,14 @@
+import copy
+import features
+import hashlib
+import io
+import itertools
+import json
+import multiprocessing
 import naivebayes as nb
 import numpy as np
-import string
+import os
+import sys
 
 
 # Constants
@@ -10,31 +18,102 @@ TESTING_FNAME = "testSet.txt"
 PP_TRAIN_FNAME = "preprocessed_train.txt"
 PP_TEST_FNAME = "preprocessed_test.txt"
 RESULTS_FNAME = "results.txt"
+CACHE_DIRNAME = "cache"
+CACHE_VERSION = 2
+MODEL_FNAME = "model.nb"
+TOKENIZER = features.Tokenizer()
+CHUNK_SIZE = 10000
+CV_SEED = 0
+SHARDS_PER_PROCESS = 4
 
 
 def main():
 
-	# Load in raw data from txt file
-	print("Loading in raw data...")
-	raw_training_data = load_data(TRAINING_FNAME)
-	raw_testing_data = load_data(TESTING_FNAME)
-
-	# Preprocess the data into a bag of words and feature vectors
-	print("Processing data into bag of words...")
-	bag = build_bag(np.vstack((raw_training_data, raw_testing_data)))
-	X_train, y_train = build_fvectors(bag, raw_training_data)
-	X_test, y_test = build_fvectors(bag, raw_testing_data)
-	preprocess_summary(bag, X_train, y_train, X_test, y_test)
+	# Words can be hashed into 2^BITS features instead with --hash BITS
+	hash_bits = None
+	if "--hash" in sys.argv:
+		hash_bits = int(sys.argv[sys.argv.index("--hash") + 1])
+
+	# Preprocessing and training can be spread over N processes with
+	# --processes N
+	processes = None
+	if "--processes" in sys.argv:
+		processes = int(sys.argv[sys.argv.index("--processes") + 1])
+
+	# The training set can be cross-validated with --folds K
+	folds = None
+	if "--folds" in sys.argv:
+		folds = int(sys.argv[sys.argv.index("--folds") + 1])
+
+	bag = features.HashingVectorizer(hash_bits) if hash_bits is not None \
+		else None
+
+	# With --stream the data files are read a chunk at a time and never
+	# held in memory, which is what cross-validation and export need
+	if "--stream" in sys.argv:
+		if folds is not None or "--export" in sys.argv:
+			raise ValueError("--stream cannot be combined with --folds or "
+				"--export")
+
+		if processes is not None:
+			print("Training NB classifier on {} processes...".format(
+				processes))
+			bag, clf = train_parallel(TRAINING_FNAME, processes, bag)
+		else:
+			print("Training NB classifier in chunks of {} samples...".format(
+				CHUNK_SIZE))
+			bag, clf = train_stream(TRAINING_FNAME, CHUNK_SIZE, bag)
+		print("Testing NB classifier on training set...")
+		train_res = test_stream(clf, bag, TRAINING_FNAME)
+		print("Testing NB classifier on testing set...")
+		test_res = test_stream(clf, bag, TESTING_FNAME)
+		print("Saving results...")
+		summary(train_res, test_res)
+		clf.save(FILE_DIR + MODEL_FNAME, bag)
+		print("Done.")
+		return
+
+	# Preprocess the data into a bag of words and feature vectors, or load
+	# them from the cache if the files and settings have not changed
+	fns = [TRAINING_FNAME, TESTING_FNAME]
+	dirname = cache_dir(fns, bag)
+	if os.path.exists(dirname):
+		print("Loading preprocessed data from cache...")
+	elif processes is not None:
+		print("Processing data on {} processes...".format(processes))
+	else:
+		print("Processing data into bag of words...")
+
+	bag, ((X_train, y_train), (X_test, y_test)) = preprocess(fns, processes,
+		bag, dirname)
+
+	# The human-readable dump is only written with --export, and hashed
+	# features have no words to write out
+	if "--export" in sys.argv and hash_bits is None:
+		print("Exporting preprocessed training data...")
+		preprocess_summary(bag, X_train, y_train, X_test, y_test)
+
+	if folds is not None:
+		print("Cross-validating NB classifier over {} folds...".format(folds))
+		fold_res = cross_validate(X_train, y_train, folds)
+		for i in range(folds):
+			print("Fold {} accuracy:\t{}".format(i + 1, fold_res[i]))
+		print("Mean accuracy:\t{}".format(np.mean(fold_res)))
 
 	# Train Naive Bayes classifier and output accuracy on test set
-	print("Training NB classifier...")
-	clf = train(bag, X_train, y_train)
+	if processes is not None:
+		print("Training NB classifier on {} processes...".format(processes))
+		bag, clf = train_parallel(TRAINING_FNAME, processes, bag)
+	else:
+		print("Training NB classifier...")
+		clf = train(bag, X_train, y_train)
 	print("Testing NB classifier on training set...")
 	train_res = test(clf, X_train, y_train)
 	print("Testing NB classifier on testing set...")
 	test_res = test(clf, X_test, y_test)
 	print("Saving results...")
 	summary(train_res, test_res)
+	clf.save(FILE_DIR + MODEL_FNAME, bag)
 	print("Done.")
 
 def load_data(fn):
@@ -46,74 +125,383 @@ def load_data(fn):
 	Returns:
 		a numpy array of 2-tuples with a list of words and the label
 	"""
-	data = []
+	return np.array(list(read_samples(fn)), dtype=object)
+
+def parse_line(line):
+	"""Splits a line of a data file into its words and label
+
+	Args:
+		line - a sentence followed by its label
+
+	Returns:
+		2-tuple of a list of words and the label
+	"""
+	sample = tokenize(line)
+	return sample[:-1], int(sample[-1])
+
+def tokenize(text):
+	"""Splits a sentence into lowercase words stripped of punctuation
+
+	Args:
+		text - the sentence to split
+
+	Returns:
+		a list of non-empty words
+	"""
+	return TOKENIZER.tokenize(text)
+
+def tokenize_batch(texts):
+	"""Splits many sentences into lowercase words stripped of punctuation
+
+	Args:
+		texts - list of sentences, one per line
+
+	Returns:
+		a list of lists of non-empty words, one per sentence
+	"""
+	return TOKENIZER.tokenize_batch([text.rstrip("\n") for text in texts])
+
+def read_samples(fn):
+	"""Lazily reads the samples of a data file one line at a time
+
+	Args:
+		fn - the filename of a textfile to read in
+
+	Returns:
+		generator of 2-tuples with a list of words and the label
+	"""
 	with open(FILE_DIR + fn, "r") as f:
 
-		for line in f.readlines():
+		for line in f:
 
-			sample = line.split()
+			if len(line.strip()) > 0:
+				yield parse_line(line)
 
-			# Strip punctuation from sentence
-			for i in range(len(sample)):
+def read_chunks(fn, chunk_size=CHUNK_SIZE):
+	"""Lazily reads the samples of a data file in fixed-size chunks
 
-				sample[i] = "".join(
-					l for l in sample[i] if l not in string.punctuation)
+	Args:
+		fn - the filename of a textfile to read in
+		chunk_size - the number of samples per chunk
 
-			data.append((sample[:-1], int(sample[-1])))
+	Returns:
+		generator of lists of at most chunk_size samples
+	"""
+	samples = read_samples(fn)
+	while True:
+
+		chunk = list(itertools.islice(samples, chunk_size))
+		if len(chunk) == 0:
+			break
 
-	return np.array(data)
+		yield chunk
 
 def build_bag(data):
 	"""Builds a bag of words from all words existing in raw data
 
 	Args:
-		data - raw data of all sentences that will be loaded into the bag
+		data - iterable of raw samples of all sentences that will be loaded
+			into the bag
 
 	Returns:
-		a list of words in alphabetical order, no dupes
+		a Vocabulary of the words in alphabetical order, no dupes
 	"""
-	bag = []
+	bag = features.Vocabulary()
 	for sample in data:
 
-		bag += [word.lower() for word in sample[0] if word not in bag and len(word) > 0]
+		bag.update(sample[0])
 
-	# Set the list to insure all dupes are removed
-	bag = list(set(bag))
-	bag.sort()
-	return bag
+	# Number the words alphabetically
+	return bag.sorted()
 
 def build_fvectors(bag, data):
 	"""Creates a feature vector given a bag of words and some raw sentence data
 
 	Args:
-		bag - bag of words
+		bag - Vocabulary of the bag of words, or a HashingVectorizer
 		data - list of samples of sentences
 
 	Returns:
-		formal vector list of features and corresponding list of labels
+		sparse CSRMatrix of binary features and numpy array of labels
 	"""
-	X, y = [], []
-	for sample in data:
+	X = vectorize(bag, [sample[0] for sample in data])
+	return X, np.array([sample[1] for sample in data])
+
+def vectorize(bag, sentences):
+	"""Creates binary feature vectors for unlabeled sentences
+
+	Args:
+		bag - Vocabulary of the bag of words, or a HashingVectorizer
+		sentences - list of lists of words
+
+	Returns:
+		sparse CSRMatrix of binary features, words not in the bag ignored
+	"""
+	rows = [[i for i in map(bag.get, words) if i is not None]
+		for words in sentences]
+	return features.build_csr(rows, len(bag))
+
+def shard_file(fn, num_shards):
+	"""Splits a data file into byte ranges which start at line boundaries
+
+	Args:
+		fn - the filename of a textfile to split
+		num_shards - the number of ranges wanted
+
+	Returns:
+		a list of at most num_shards (start, end) byte offsets covering the
+		file, in order
+	"""
+	size = os.path.getsize(FILE_DIR + fn)
+	bounds = [0]
+	with open(FILE_DIR + fn, "rb") as f:
+
+		for i in range(1, num_shards):
+
+			# move each cut to the start of the next line
+			f.seek(max(size * i // num_shards, bounds[-1]))
+			if f.tell() > 0:
+				f.seek(f.tell() - 1)
+				f.readline()
+
+			if f.tell() < size and f.tell() > bounds[-1]:
+				bounds.append(f.tell())
+
+	bounds.append(size)
+	return list(zip(bounds[:-1], bounds[1:]))
+
+def preprocess_shard(task):
+	"""Tokenizes and vectorizes the samples of one byte range of a file
+
+	Without a bag given the features are numbered by a Vocabulary local to
+	the shard, which the caller maps to the merged bag.
+
+	Args:
+		task - 4-tuple of the filename, the start and end byte offsets and
+			the HashingVectorizer or fixed Vocabulary to use, or None
+
+	Returns:
+		3-tuple of the shard's words in local id order (None if a bag was
+		given), the CSRMatrix of binary features and the numpy array of labels
+	"""
+	fn, start, end, bag = task
+	with open(FILE_DIR + fn, "rb") as f:
+
+		f.seek(start)
+		raw = f.read(end - start)
+
+	# decode and split lines exactly as read_samples does in text mode
+	with io.TextIOWrapper(io.BytesIO(raw)) as f:
+
+		lines = [line for line in f if len(line.strip()) > 0]
+
+	sentences = tokenize_batch(lines)
+	y = np.array([int(words.pop()) for words in sentences], dtype=int)
+
+	words = None
+	if bag is None:
+		bag = features.Vocabulary()
+		for sentence in sentences:
+
+			bag.update(sentence)
+
+		words = bag.words
+
+	return words, vectorize(bag, sentences), y
+
+def preprocess_parallel(fns, processes=None, bag=None):
+	"""Preprocesses data files with a pool of processes
+
+	Every file is split into byte ranges which are tokenized and
+	vectorized in parallel.  The shards' vocabularies are then merged into
+	one alphabetical bag of words and their feature ids remapped, so the
+	result is the same as build_bag and build_fvectors give.
+
+	Args:
+		fns - list of filenames of the data files
+		processes - pool size, or None for every core
+		bag - HashingVectorizer to use instead of a bag of words, or None
+
+	Returns:
+		2-tuple of the bag of words (or the HashingVectorizer) and a list
+		with a 2-tuple of the CSRMatrix and labels of every file
+	"""
+	num_shards = (processes or multiprocessing.cpu_count()) \
+		* SHARDS_PER_PROCESS
+	tasks = [(fn, start, end, bag) for fn in fns
+		for start, end in shard_file(fn, num_shards)]
+
+	with multiprocessing.Pool(processes) as pool:
+
+		shards = pool.map(preprocess_shard, tasks)
+
+	if bag is None:
+
+		bag = features.Vocabulary()
+		for words, X, y in shards:
+
+			bag.update(words)
+
+		bag = bag.sorted()
+
+	# Remap every shard to the merged ids, keeping each row sorted
+	matrices = []
+	for words, X, y in shards:
+
+		if words is not None:
+			ids = np.array([bag[word] for word in words], dtype=np.int32)
+			indices = ids[X.indices]
+			order = np.lexsort((indices, X.row_ids()))
+			X = features.CSRMatrix(indices[order], X.indptr, len(bag))
+
+		matrices.append(X)
+
+	res = []
+	for fn in fns:
+
+		rows = [i for i, task in enumerate(tasks) if task[0] == fn]
+		res.append((features.stack_csr([matrices[i] for i in rows], len(bag)),
+			np.concatenate([shards[i][2] for i in rows])))
+
+	return bag, res
+
+def preprocess(fns, processes=None, bag=None, dirname=None):
+	"""Preprocesses data files into feature vectors, caching the results
+
+	Results are cached in a directory named after a hash of the files'
+	contents and the preprocessing settings, so they are only recomputed
+	when one of those changes.  Cached arrays are memory-mapped.
+
+	Args:
+		fns - list of filenames of the data files
+		processes - pool size to preprocess in parallel, or None to
+			preprocess in this process
+		bag - HashingVectorizer to use instead of a bag of words, or None
+		dirname - the cache directory if already found by cache_dir, which
+			hashes every file, or None to find it
+
+	Returns:
+		2-tuple of the bag of words (or the HashingVectorizer) and a list
+		with a 2-tuple of the CSRMatrix and labels of every file
+	"""
+	if dirname is None:
+		dirname = cache_dir(fns, bag)
 
-		sample_vector = []
+	if os.path.exists(dirname):
+		return load_preprocessed(dirname, len(fns), bag)
 
-		for word in bag:
+	if processes is not None:
+		bag, res = preprocess_parallel(fns, processes, bag)
 
-			sample_vector += [1] if word in sample[0] else [0] 
+	else:
+		raw_data = [load_data(fn) for fn in fns]
+		if bag is None:
+			bag = build_bag(itertools.chain(*raw_data))
 
-		X.append(sample_vector)
-		y.append(sample[1])
+		res = [build_fvectors(bag, data) for data in raw_data]
 
-	return X, y
+	save_preprocessed(dirname, bag, res)
+	return bag, res
+
+def cache_dir(fns, bag=None):
+	"""Names the cache directory of preprocessed data files
+
+	Args:
+		fns - list of filenames of the data files
+		bag - HashingVectorizer to use instead of a bag of words, or None
+
+	Returns:
+		path of the directory, which may not exist yet
+	"""
+	key = hashlib.sha256()
+	key.update(json.dumps({"version": CACHE_VERSION,
+		"tokenizer": TOKENIZER.settings(),
+		"hash_bits": bag.bits if bag is not None else None},
+		sort_keys=True).encode("utf-8"))
+
+	for fn in fns:
+
+		key.update(str(os.path.getsize(FILE_DIR + fn)).encode("utf-8"))
+		with open(FILE_DIR + fn, "rb") as f:
+
+			for block in iter(lambda: f.read(1 << 20), b""):
+				key.update(block)
+
+	return os.path.join(FILE_DIR, CACHE_DIRNAME, key.hexdigest())
+
+def save_preprocessed(dirname, bag, res):
+	"""Writes preprocessed data to a cache directory
+
+	The directory is written under a temporary name and renamed once
+	complete, so an interrupted run never leaves a partial cache.
+
+	Args:
+		dirname - the cache directory to create
+		bag - Vocabulary of the bag of words, or a HashingVectorizer
+		res - list with a 2-tuple of the CSRMatrix and labels of every file
+
+	Returns:
+		(none)
+	"""
+	tmp_dirname = "{}.{}.tmp".format(dirname, os.getpid())
+	os.makedirs(tmp_dirname)
+
+	if isinstance(bag, features.Vocabulary):
+		with open(os.path.join(tmp_dirname, "words.txt"), "w",
+			encoding="utf-8") as f:
+
+			f.write("\n".join(bag))
+
+	# the features are binary, so their values are not stored
+	for i, (X, y) in enumerate(res):
+
+		np.save(os.path.join(tmp_dirname, "indices{}.npy".format(i)),
+			X.indices)
+		np.save(os.path.join(tmp_dirname, "indptr{}.npy".format(i)),
+			X.indptr)
+		np.save(os.path.join(tmp_dirname, "labels{}.npy".format(i)), y)
+
+	os.rename(tmp_dirname, dirname)
+
+def load_preprocessed(dirname, num_files, bag=None):
+	"""Memory-maps preprocessed data from a cache directory
+
+	Args:
+		dirname - the cache directory written by save_preprocessed
+		num_files - the number of data files cached
+		bag - the HashingVectorizer the data was cached with, or None
+
+	Returns:
+		2-tuple of the bag of words (or the HashingVectorizer) and a list
+		with a 2-tuple of the CSRMatrix and labels of every file
+	"""
+	if bag is None:
+		with open(os.path.join(dirname, "words.txt"), "r",
+			encoding="utf-8") as f:
+
+			words = f.read()
+
+		bag = features.Vocabulary(words.split("\n") if len(words) > 0
+			else [])
+
+	res = []
+	for i in range(num_files):
+
+		arrays = [np.load(os.path.join(dirname, "{}{}.npy".format(name, i)),
+			mmap_mode="r") for name in ("indices", "indptr", "labels")]
+		res.append((features.CSRMatrix(arrays[0], arrays[1], len(bag)),
+			arrays[2]))
+
+	return bag, res
 
 def preprocess_summary(bag, X_train, y_train, X_test, y_test):
 	"""Outputs the bag of words and all samples as requested by assignment
 
 	Args:
 		bag - bag of words the headline file
-		X_train - sentence samples for training
+		X_train - CSRMatrix of sentence samples for training
 		y_train - sentence labels for training
-		X_test - sentence samples for testing
+		X_test - CSRMatrix of sentence samples for testing
 		y_test - sentence labels for testing
 
 	Returns:
@@ -121,81 +509,205 @@ def preprocess_summary(bag, X_train, y_train, X_test, y_test):
 	"""
 	with open(FILE_DIR + PP_TRAIN_FNAME, "w") as f:
 
-		for word in bag:
-
-			f.write("{},".format(word))
-
-		f.write("classlabel\n")
+		f.write(",".join(bag) + ",classlabel\n")
 
 		for i in range(len(X_train)):
 
-			for val in X_train[i]:
+			sample_vector = ["0"] * len(bag)
+			for j in X_train.row(i):
+				sample_vector[j] = "1"
 
-				f.write("{},".format(val))
-
-			f.write("{}\n".format(y_train[i]))
+			f.write(",".join(sample_vector) + ",{}\n".format(y_train[i]))
 
 def train(bag, X_train, y_train):
 	"""Trains a naive Bayes classifier on the bag of words given
 
 	Args:
-		bag - bag of words as a list
-		X_train - feature vector of word frequency in sentences
+		bag - Vocabulary of the bag of words, or a HashingVectorizer
+		X_train - CSRMatrix of word presence in sentences
 		y_train - label vector of positive or negative review
 
 	Returns:
 		NaiveBayesClassifier object with weights gathered from X_train
 	"""
-	# Initialize classifier
-	clf = nb.NaiveBayesClassifier(2, len(X_train[0]))
-
-	# Add log priors
-	clf.priors.append(np.log((len(y_train) - sum(y_train))/len(y_train)))
-	clf.priors.append(np.log((sum(y_train))/len(y_train)))
-	
-	# Update word frequencies
-	for i in range(len(X_train)):
+	# Initialize classifier and gather the priors and word frequencies
+	clf = nb.NaiveBayesClassifier(2, X_train.shape[1])
+	clf.partial_fit(X_train, y_train)
 
-		clf.frequency_list[y_train[i]] = np.add(X_train[i], 
-			clf.frequency_list[y_train[i]])
+	# Precompute the log likelihood tables used for every prediction
+	clf.update_log_probs()
 
 	return clf
 
+def train_stream(fn, chunk_size=CHUNK_SIZE, bag=None):
+	"""Trains a naive Bayes classifier without loading the whole file
+
+	The bag of words grows as new words are seen, so only the counts and
+	one chunk of samples are ever held in memory.  With a HashingVectorizer
+	the counts never grow either.
+
+	Args:
+		fn - the filename of the training set
+		chunk_size - the number of samples read at a time
+		bag - HashingVectorizer or Vocabulary to extend, or None to start
+			from an empty bag of words
+
+	Returns:
+		2-tuple of the bag of words, in the order words were first seen,
+		and the trained NaiveBayesClassifier object
+	"""
+	if bag is None:
+		bag = features.Vocabulary()
+
+	clf = nb.NaiveBayesClassifier(2, len(bag))
+	for chunk in read_chunks(fn, chunk_size):
+
+		for sample in chunk:
+
+			bag.update(sample[0])
+
+		X, y = build_fvectors(bag, chunk)
+		clf.partial_fit(X, y)
+
+	clf.update_log_probs()
+	return bag, clf
+
+def train_shard(task):
+	"""Trains a naive Bayes classifier on one byte range of a file
+
+	Args:
+		task - 4-tuple as taken by preprocess_shard
+
+	Returns:
+		2-tuple of the shard's words in local id order (None if a bag was
+		given) and the NaiveBayesClassifier object trained on the shard
+	"""
+	words, X, y = preprocess_shard(task)
+	clf = nb.NaiveBayesClassifier(2, X.shape[1])
+	clf.partial_fit(X, y)
+	return words, clf
+
+def train_parallel(fn, processes=None, bag=None):
+	"""Trains a naive Bayes classifier by map-reduce over shards of a file
+
+	Every shard is counted into its own classifier in a pool of processes,
+	then the classifiers are merged with their vocabularies aligned.  Only
+	counts travel between processes, never feature vectors.
+
+	Args:
+		fn - the filename of the training set
+		processes - pool size, or None for every core
+		bag - HashingVectorizer or fixed Vocabulary, e.g. one built by
+			preprocess, to use, or None to build a bag of words
+
+	Returns:
+		2-tuple of the bag of words, in the order words were first seen
+		unless given, and the trained NaiveBayesClassifier object
+	"""
+	num_shards = (processes or multiprocessing.cpu_count()) \
+		* SHARDS_PER_PROCESS
+	tasks = [(fn, start, end, bag) for start, end in shard_file(fn,
+		num_shards)]
+
+	with multiprocessing.Pool(processes) as pool:
+
+		shards = pool.map(train_shard, tasks)
+
+	if bag is None:
+		bag = features.Vocabulary()
+
+	clf = nb.NaiveBayesClassifier(2, len(bag))
+	for words, shard_clf in shards:
+
+		clf.merge(shard_clf, bag.align(words) if words is not None else None)
+
+	clf.update_log_probs()
+	return bag, clf
+
 def test(clf, X_test, y_test):
 	"""Tests a naive Bayes classifier on vectorized sentences
 
 	Args:
 		clf - trained naive bayes classifier object
-		X_test - feature vector of word frequency in sentences
+		X_test - CSRMatrix of word presence in sentences
 		y_train - label vector of positive or negative review
 
 	Returns:
 		(none)
 	"""
-	pred = []
-	for i in range(len(X_test)):
+	pred = clf.predict(X_test)
 
-		likelihood = [clf.priors[0], clf.priors[1]]
+	# Determine accuracy
+	return float(np.sum(pred == y_test)) / len(pred)
 
-		for j in range(len(X_test[i])):
+def test_stream(clf, bag, fn, chunk_size=CHUNK_SIZE):
+	"""Tests a naive Bayes classifier without loading the whole file
 
-			# Find which words are in the "sentence"
-			if X_test[i][j] == 1:
+	Args:
+		clf - trained naive bayes classifier object
+		bag - Vocabulary of the bag of words the classifier was trained on,
+			or the HashingVectorizer it was trained with
+		fn - the filename of the data file to test on
+		chunk_size - the number of samples read at a time
 
-				likelihood[0] += np.log(
-					clf.frequency_list[0][j] / sum(clf.frequency_list[0]))
-				likelihood[1] += np.log(
-					clf.frequency_list[1][j] / sum(clf.frequency_list[1]))
+	Returns:
+		the accuracy over every sample of the file
+	"""
+	correct = 0
+	total = 0
+	for chunk in read_chunks(fn, chunk_size):
 
-		pred.append(0) if likelihood[0] > likelihood[1] else pred.append(1)
+		X, y = build_fvectors(bag, chunk)
+		correct += int(np.sum(clf.predict(X) == y))
+		total += len(y)
 
-	# Determine accuracy
-	res = 0
-	for i in range(len(pred)):
+	return float(correct) / total
+
+def cross_validate(X, y, k, seed=CV_SEED):
+	"""Estimates accuracy by k-fold cross-validation
+
+	The word and class counts of every fold are gathered once.  The model
+	for a fold is then the total counts with the fold's own counts taken
+	away, so no model is ever trained from scratch.
+
+	Args:
+		X - CSRMatrix of word presence in sentences
+		y - numpy array of the labels of the sentences
+		k - the number of folds
+		seed - seed for the random assignment of samples to folds
+
+	Returns:
+		list of the accuracy on each fold
+
+	Raises:
+		ValueError if k is less than 2 or more than the number of samples
+	"""
+	if k < 2 or k > len(y):
+		raise ValueError("folds must be between 2 and {}".format(len(y)))
+
+	fold_of = np.random.RandomState(seed).permutation(len(y)) % k
+
+	# Count every fold once and add them all up
+	fold_clfs = []
+	total = nb.NaiveBayesClassifier(2, X.shape[1])
+	for i in range(k):
+
+		rows = fold_of == i
+		clf = nb.NaiveBayesClassifier(2, X.shape[1])
+		clf.partial_fit(X.select(rows), y[rows])
+		total.merge(clf)
+		fold_clfs.append(clf)
+
+	res = []
+	for i in range(k):
+
+		clf = copy.deepcopy(total)
+		clf.subtract(fold_clfs[i])
 
-		res += 1 if pred[i] == y_test[i] else 0
+		rows = fold_of == i
+		res.append(test(clf, X.select(rows), y[rows]))
 
-	return res/len(pred)
+	return res
 
 def summary(training_results, testing_results):
 	"""Writes a summary of NB classifier performance
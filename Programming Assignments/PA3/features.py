@@ -0,0 +1,389 @@
+import string
+import zlib
+
+import numpy as np
+
+
+class Vocabulary(object):
+	"""Two-way mapping between the words of a bag and their feature ids
+
+	Ids are handed out in the order words are first added, so building a
+	vocabulary is a single pass of dictionary lookups over the corpus.
+
+	Attributes:
+		ids - dictionary from a word to its id
+		words - list of the words, indexed by id
+	"""
+	def __init__(self, words=()):
+		super(Vocabulary, self).__init__()
+		self.ids = {}
+		self.words = []
+		self.update(words)
+
+	def __len__(self):
+		return len(self.words)
+
+	def __iter__(self):
+		return iter(self.words)
+
+	def __contains__(self, word):
+		return word in self.ids
+
+	def __getitem__(self, word):
+		return self.ids[word]
+
+	def add(self, word):
+		"""Adds a word to the vocabulary if it is not already in it
+
+		Args:
+			word - the word to add
+
+		Returns:
+			the id of the word
+		"""
+		i = self.ids.get(word)
+		if i is None:
+			i = self.ids[word] = len(self.words)
+			self.words.append(word)
+
+		return i
+
+	def update(self, words):
+		"""Adds every word of an iterable to the vocabulary
+
+		Args:
+			words - iterable of words
+
+		Returns:
+			(none)
+		"""
+		for word in words:
+			if word not in self.ids:
+				self.ids[word] = len(self.words)
+				self.words.append(word)
+
+	def align(self, words):
+		"""Adds words from another bag of words, mapping their ids to ours
+
+		Args:
+			words - list of the other bag's words, indexed by their id
+
+		Returns:
+			numpy int64 array of the id of every word in this vocabulary
+		"""
+		return np.array([self.add(word) for word in words], dtype=np.int64)
+
+	def get(self, word, default=None):
+		"""Looks up the id of a word
+
+		Args:
+			word - the word to look up
+			default - value returned if the word is not in the vocabulary
+
+		Returns:
+			the id of the word, or default
+		"""
+		return self.ids.get(word, default)
+
+	def word(self, i):
+		"""Looks up the word with a given id
+
+		Args:
+			i - id of the word
+
+		Returns:
+			the word
+		"""
+		return self.words[i]
+
+	def sorted(self):
+		"""Creates a copy of the vocabulary with ids in alphabetical order
+
+		Args:
+			(none)
+
+		Returns:
+			a new Vocabulary object
+		"""
+		return Vocabulary(sorted(self.words))
+
+class HashingVectorizer(object):
+	"""Maps words to a fixed number of feature buckets by hashing them
+
+	A drop-in replacement for a Vocabulary when the bag of words would grow
+	without bound: no words are stored and every word, seen before or not,
+	has a feature id.  CRC-32 is used since, unlike hash(), it is the same
+	in every process and every run.
+
+	Attributes:
+		bits - log2 of the number of buckets
+		mask - bit mask reducing a hash to a bucket
+	"""
+	def __init__(self, bits=18):
+		super(HashingVectorizer, self).__init__()
+		self.bits = bits
+		self.mask = (1 << bits) - 1
+
+	def __len__(self):
+		return self.mask + 1
+
+	def __contains__(self, word):
+		return True
+
+	def __getitem__(self, word):
+		return zlib.crc32(word.encode("utf-8")) & self.mask
+
+	def get(self, word, default=None):
+		"""Finds the bucket of a word
+
+		Args:
+			word - the word to look up
+			default - unused, every word has a bucket
+
+		Returns:
+			the bucket of the word
+		"""
+		return zlib.crc32(word.encode("utf-8")) & self.mask
+
+	def update(self, words):
+		"""Does nothing, the buckets never change
+
+		Args:
+			words - iterable of words
+
+		Returns:
+			(none)
+		"""
+		pass
+
+class Tokenizer(object):
+	"""Splits sentences into words with a precompiled translation table
+
+	Punctuation is deleted and ASCII letters are lowercased by a single
+	str.translate pass, so training and test sentences are always reduced
+	to the same words.
+
+	Attributes:
+		lowercase - True if words are lowercased
+		punctuation - string of the characters deleted from words
+		table - translation table used by str.translate
+	"""
+	def __init__(self, lowercase=True, punctuation=string.punctuation):
+		super(Tokenizer, self).__init__()
+		self.lowercase = lowercase
+		self.punctuation = punctuation
+		if lowercase:
+			self.table = str.maketrans(string.ascii_uppercase,
+				string.ascii_lowercase, punctuation)
+		else:
+			self.table = str.maketrans("", "", punctuation)
+
+	def normalize(self, text):
+		"""Deletes punctuation from text and lowercases it
+
+		Args:
+			text - the text to normalize
+
+		Returns:
+			the normalized text
+		"""
+		text = text.translate(self.table)
+
+		# the table only covers ASCII letters
+		if self.lowercase and not text.isascii():
+			text = text.lower()
+
+		return text
+
+	def tokenize(self, text):
+		"""Splits a sentence into normalized words
+
+		Args:
+			text - the sentence to split
+
+		Returns:
+			a list of non-empty words
+		"""
+		return self.normalize(text).split()
+
+	def tokenize_batch(self, texts):
+		"""Splits many single-line sentences into normalized words at once
+
+		The sentences are normalized as one string, which saves a call to
+		str.translate per sentence.
+
+		Args:
+			texts - list of sentences without line breaks
+
+		Returns:
+			a list of lists of non-empty words, one per sentence
+		"""
+		if len(texts) == 0:
+			return []
+
+		joined = self.normalize("\n".join(texts))
+		return [line.split() for line in joined.split("\n")]
+
+	def settings(self):
+		"""Describes the options that change the words produced
+
+		Args:
+			(none)
+
+		Returns:
+			dictionary of the tokenizer options
+		"""
+		return {"lowercase": self.lowercase, "punctuation": self.punctuation}
+
+class CSRMatrix(object):
+	"""Compressed sparse row matrix of feature values
+
+	Only the non-zero entries are stored, so memory and the time of every
+	operation scale with the number of non-zero entries rather than with
+	rows times columns.
+
+	Attributes:
+		indices - numpy int32 array of the column of every non-zero entry,
+			row after row
+		indptr - numpy int64 array of row boundaries, row i's entries are
+			indices[indptr[i]:indptr[i + 1]]
+		data - numpy array of the value of every non-zero entry
+		shape - 2-tuple of the number of rows and columns
+	"""
+	def __init__(self, indices, indptr, num_cols, data=None):
+		super(CSRMatrix, self).__init__()
+		self.indices = np.asarray(indices, dtype=np.int32)
+		self.indptr = np.asarray(indptr, dtype=np.int64)
+		self.data = np.ones(len(self.indices), dtype=np.int32) \
+			if data is None else np.asarray(data)
+		self.shape = (len(self.indptr) - 1, num_cols)
+
+	def __len__(self):
+		return self.shape[0]
+
+	def row(self, i):
+		"""Reads the columns of the non-zero entries of a row
+
+		Args:
+			i - index of the row
+
+		Returns:
+			numpy array of the row's columns in ascending order
+		"""
+		return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+	def row_ids(self):
+		"""Finds the row of every non-zero entry
+
+		Args:
+			(none)
+
+		Returns:
+			numpy int64 array parallel to indices
+		"""
+		return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+	def column_sums(self, rows=None):
+		"""Sums the columns over all or some of the rows
+
+		Args:
+			rows - boolean numpy array selecting the rows to sum, or None for
+				every row
+
+		Returns:
+			numpy array of length shape[1]
+		"""
+		if rows is None:
+			indices, data = self.indices, self.data
+		else:
+			entries = np.repeat(rows, np.diff(self.indptr))
+			indices, data = self.indices[entries], self.data[entries]
+
+		return np.bincount(indices, weights=data,
+			minlength=self.shape[1]).astype(self.data.dtype)
+
+	def dot(self, dense):
+		"""Multiplies the matrix by a dense matrix
+
+		Args:
+			dense - 2D numpy array with shape[1] rows
+
+		Returns:
+			2D numpy float array with a row per row of this matrix and a
+			column per column of dense
+		"""
+		rows = self.row_ids()
+		out = np.empty((self.shape[0], dense.shape[1]))
+		for c in range(dense.shape[1]):
+			out[:, c] = np.bincount(rows, weights=self.data
+				* dense[self.indices, c], minlength=self.shape[0])
+
+		return out
+
+	def select(self, rows):
+		"""Copies some of the rows into a new matrix
+
+		Args:
+			rows - boolean numpy array selecting the rows to keep
+
+		Returns:
+			a CSRMatrix of the selected rows, in order
+		"""
+		lengths = np.diff(self.indptr)
+		entries = np.repeat(rows, lengths)
+		indptr = np.concatenate(([0], np.cumsum(lengths[rows])))
+		return CSRMatrix(self.indices[entries], indptr, self.shape[1],
+			self.data[entries])
+
+	def toarray(self):
+		"""Expands the matrix into a dense array
+
+		Args:
+			(none)
+
+		Returns:
+			2D numpy array of shape self.shape
+		"""
+		dense = np.zeros(self.shape, dtype=self.data.dtype)
+		dense[self.row_ids(), self.indices] = self.data
+		return dense
+
+def build_csr(rows, num_cols):
+	"""Builds a binary CSRMatrix from the feature ids of every row
+
+	Args:
+		rows - iterable of iterables of feature ids, duplicates allowed
+		num_cols - number of features
+
+	Returns:
+		CSRMatrix with a 1 for every feature present in a row
+	"""
+	indices = []
+	indptr = [0]
+	for ids in rows:
+
+		indices += sorted(set(ids))
+		indptr.append(len(indices))
+
+	return CSRMatrix(indices, indptr, num_cols)
+
+def stack_csr(matrices, num_cols):
+	"""Stacks the rows of several CSRMatrix objects into one
+
+	Args:
+		matrices - list of CSRMatrix objects, in row order
+		num_cols - number of columns of the stacked matrix
+
+	Returns:
+		a CSRMatrix with the rows of every matrix
+	"""
+	indptr = [np.zeros(1, dtype=np.int64)]
+	offset = 0
+	for X in matrices:
+
+		indptr.append(X.indptr[1:] + offset)
+		offset += X.indptr[-1]
+
+	return CSRMatrix(np.concatenate([X.indices for X in matrices]),
+		np.concatenate(indptr), num_cols,
+		np.concatenate([X.data for X in matrices]))
@@ -1,13 +1,278 @@
+import mmap
+import struct
+
+import numpy as np
+
+import features
+
+
+# Constants
+MODEL_MAGIC = b"NBCL"
+MODEL_VERSION = 2
+MODEL_HEADER = struct.Struct("<4sIIII")
+
+
 class NaiveBayesClassifier(object):
 	"""Naive Bayes classifier implementation for a bag of words
 
 	Attributes:
 		num_classes - the number of classes to classify
-		frequency_list - a list of arrays with words frequencies
-		class_distrib - a list of log priors of each class label
+		frequency_list - num_classes x num_words numpy array of word
+			frequencies, starting from one for smoothing
+		class_counts - numpy array of the number of samples of each class
+		priors - a list of log priors of each class label
+		log_probs - num_classes x num_words numpy array of the log
+			likelihood of each word given each class, computed from
+			frequency_list by update_log_probs
+
+	A classifier read by load_classifier only has its priors and log
+	likelihoods, so it can predict but not be trained further.
 	"""
 	def __init__(self, num_classes, num_words):
 		super(NaiveBayesClassifier, self).__init__()
 		self.num_classes = num_classes
-		self.frequency_list = [[1 for j in range(num_words)] for i in range(num_classes)]
-		self.priors = []
\ No newline at end of file
+		self.frequency_list = np.ones((num_classes, num_words), dtype=np.int64)
+		self.class_counts = np.zeros(num_classes, dtype=np.int64)
+		self.priors = []
+		self.log_probs = None
+
+	def partial_fit(self, X, y):
+		"""Adds a chunk of samples to the class and word counts
+
+		The classifier grows to the number of words of X, so the bag of
+		words may keep expanding between chunks.  The log likelihood tables
+		are recomputed on the next prediction.
+
+		Args:
+			X - CSRMatrix of word presence in sentences
+			y - numpy array of the class labels of the sentences
+
+		Returns:
+			(none)
+		"""
+		self.grow(X.shape[1])
+		for c in range(self.num_classes):
+
+			self.frequency_list[c, :X.shape[1]] += X.column_sums(y == c)
+			self.class_counts[c] += np.sum(y == c)
+
+		self.update_priors()
+
+	def merge(self, other, ids=None):
+		"""Adds the counts of a classifier trained on other samples
+
+		Training is only counting, so merging classifiers trained on
+		separate shards gives the classifier trained on all of them.
+
+		Args:
+			other - NaiveBayesClassifier object to merge in
+			ids - numpy array of the id in this classifier's bag of words of
+				every word of other's, or None if they share a bag of words
+
+		Returns:
+			(none)
+		"""
+		if ids is None:
+			ids = np.arange(other.frequency_list.shape[1])
+
+		self.grow(int(ids.max()) + 1 if len(ids) > 0 else 0)
+
+		# both tables start every word from one, keep only one of them
+		self.frequency_list[:, ids] += other.frequency_list - 1
+		self.class_counts += other.class_counts
+		self.update_priors()
+
+	def subtract(self, other):
+		"""Removes the counts of a classifier trained on some of the samples
+
+		Args:
+			other - NaiveBayesClassifier object sharing this classifier's bag
+				of words, trained on samples this classifier was trained on
+
+		Returns:
+			(none)
+		"""
+		num_words = other.frequency_list.shape[1]
+		self.frequency_list[:, :num_words] -= other.frequency_list - 1
+		self.class_counts -= other.class_counts
+		self.update_priors()
+
+	def grow(self, num_words):
+		"""Widens the word frequencies to a larger bag of words
+
+		New words start from the same smoothing count as every other.
+
+		Args:
+			num_words - the number of words needed
+
+		Returns:
+			(none)
+		"""
+		old_num_words = self.frequency_list.shape[1]
+		if num_words > old_num_words:
+
+			grown = np.ones((self.num_classes, num_words), dtype=np.int64)
+			grown[:, :old_num_words] = self.frequency_list
+			self.frequency_list = grown
+
+	def update_priors(self):
+		"""Recomputes the log priors from the class counts
+
+		The log likelihood tables are recomputed on the next prediction.
+
+		Args:
+			(none)
+
+		Returns:
+			(none)
+		"""
+		# a class not seen yet, e.g. in a small or empty shard, is impossible
+		total = self.class_counts.sum()
+		with np.errstate(divide="ignore", invalid="ignore"):
+			self.priors = [np.log(count / total) for count in self.class_counts]
+
+		self.log_probs = None
+
+	def update_log_probs(self):
+		"""Precomputes the log likelihood tables from the word frequencies
+
+		Called automatically by the first prediction after training.
+
+		Args:
+			(none)
+
+		Returns:
+			(none)
+		"""
+		freq = np.array(self.frequency_list, dtype=np.float64)
+		self.log_probs = np.log(freq / freq.sum(axis=1, keepdims=True))
+
+	def joint_log_likelihood(self, X):
+		"""Scores a batch of samples against every class
+
+		Args:
+			X - CSRMatrix of word presence in sentences
+
+		Returns:
+			N x num_classes numpy array of log prior plus log likelihood
+		"""
+		if self.log_probs is None:
+			self.update_log_probs()
+
+		return X.dot(self.log_probs.T) + np.array(self.priors)
+
+	def predict_log_proba(self, X):
+		"""Computes the log posterior of every class for a batch of samples
+
+		Args:
+			X - CSRMatrix of word presence in sentences
+
+		Returns:
+			N x num_classes numpy array of normalized log probabilities
+		"""
+		scores = self.joint_log_likelihood(X)
+		top = scores.max(axis=1, keepdims=True)
+		return scores - top - np.log(np.exp(scores - top).sum(axis=1,
+			keepdims=True))
+
+	def predict(self, X):
+		"""Predicts the most likely class of a batch of samples
+
+		Args:
+			X - CSRMatrix of word presence in sentences
+
+		Returns:
+			numpy array of N class labels
+		"""
+		return self.best_class(self.joint_log_likelihood(X))
+
+	def best_class(self, scores):
+		"""Picks the highest scoring class of every sample
+
+		Ties go to the highest class label.
+
+		Args:
+			scores - N x num_classes numpy array of log likelihoods or log
+				probabilities
+
+		Returns:
+			numpy array of N class labels
+		"""
+		return self.num_classes - 1 - np.argmax(scores[:, ::-1], axis=1)
+
+	def save(self, fn, bag):
+		"""Writes the classifier and its bag of words to a binary file
+
+		The file is a header of the magic, format version, number of classes,
+		number of words and hash bits (0 for a bag of words), followed by the
+		float64 log priors, the float32 log likelihood table and, unless the
+		words were hashed, the newline-separated words in UTF-8.
+
+		Args:
+			fn - the filename to write the model to
+			bag - Vocabulary of the bag of words the classifier was trained
+				on, or the HashingVectorizer it was trained with
+
+		Returns:
+			(none)
+		"""
+		if self.log_probs is None:
+			self.update_log_probs()
+
+		num_words = self.log_probs.shape[1]
+		hashed = isinstance(bag, features.HashingVectorizer)
+		with open(fn, "wb") as f:
+
+			f.write(MODEL_HEADER.pack(MODEL_MAGIC, MODEL_VERSION,
+				self.num_classes, num_words, bag.bits if hashed else 0))
+			f.write(np.asarray(self.priors, dtype="<f8").tobytes())
+			f.write(self.log_probs.astype("<f4").tobytes())
+			if not hashed:
+				f.write("\n".join(bag.word(i)
+					for i in range(num_words)).encode("utf-8"))
+
+def load_classifier(fn):
+	"""Memory-maps a classifier written by NaiveBayesClassifier.save
+
+	The log likelihood table is used straight from the mapped file, so
+	loading costs little more than reading the bag of words.
+
+	Args:
+		fn - the filename of the model
+
+	Returns:
+		2-tuple of the Vocabulary of the bag of words (or HashingVectorizer)
+		and the NaiveBayesClassifier object
+
+	Raises:
+		ValueError if the file is not a model of a supported version
+	"""
+	with open(fn, "rb") as f:
+		data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+	magic, version, num_classes, num_words, hash_bits = \
+		MODEL_HEADER.unpack_from(data)
+	if magic != MODEL_MAGIC or version != MODEL_VERSION:
+		raise ValueError("{} is not a version {} model file.".format(fn,
+			MODEL_VERSION))
+
+	offset = MODEL_HEADER.size
+	priors = np.frombuffer(data, dtype="<f8", count=num_classes,
+		offset=offset)
+	offset += priors.nbytes
+	log_probs = np.frombuffer(data, dtype="<f4", count=num_classes
+		* num_words, offset=offset).reshape(num_classes, num_words)
+	offset += log_probs.nbytes
+
+	if hash_bits > 0:
+		bag = features.HashingVectorizer(hash_bits)
+	else:
+		words = data[offset:].decode("utf-8")
+		bag = features.Vocabulary(words.split("\n") if num_words > 0 else [])
+
+	clf = NaiveBayesClassifier(num_classes, 0)
+	clf.frequency_list = None
+	clf.class_counts = None
+	clf.priors = priors.tolist()
+	clf.log_probs = log_probs
+	return bag, clf
@@ -0,0 +1,118 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+import naivebayes as nb
+import PA3
+
+
+# Constants
+DEFAULT_BATCH_SIZE = 1000
+
+
+def main():
+
+	parser = argparse.ArgumentParser(
+		description="Classifies reviews read line by line with a saved model")
+	parser.add_argument("input", nargs="?", default="-",
+		help="file of reviews, one per line (default: stdin)")
+	parser.add_argument("-m", "--model", default=PA3.FILE_DIR
+		+ PA3.MODEL_FNAME, help="model saved by PA3.py")
+	parser.add_argument("-b", "--batch-size", type=int,
+		default=DEFAULT_BATCH_SIZE, help="reviews scored at a time")
+	parser.add_argument("--labeled", action="store_true",
+		help="reviews end with their label, report the accuracy")
+	args = parser.parse_args()
+
+	bag, clf = nb.load_classifier(args.model)
+
+	f = sys.stdin if args.input == "-" else open(args.input, "r")
+	try:
+		stats = predict_stream(bag, clf, f, sys.stdout, args.batch_size,
+			args.labeled)
+
+	# the rest of the pipeline stopped reading, e.g. head
+	except BrokenPipeError:
+		os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+		sys.exit(1)
+
+	finally:
+		if f is not sys.stdin:
+			f.close()
+
+	print_summary(stats, args.labeled)
+
+def predict_stream(bag, clf, lines, out, batch_size, labeled=False):
+	"""Classifies a stream of reviews in fixed-size batches
+
+	Every review is answered with a line of its predicted label and the log
+	probability of each class, separated by tabs.  Only one batch is held
+	in memory at a time.
+
+	Args:
+		bag - Vocabulary of the bag of words of the model
+		clf - trained NaiveBayesClassifier object
+		lines - iterable of reviews, one per line
+		out - file object the predictions are written to
+		batch_size - number of reviews scored at a time
+		labeled - True if every review ends with its label
+
+	Returns:
+		dictionary of the number of reviews, correct predictions (if
+		labeled) and elapsed seconds
+	"""
+	stats = {"docs": 0, "correct": 0}
+	start = time.perf_counter()
+
+	lines = (line for line in lines if len(line.strip()) > 0)
+	while True:
+
+		batch = list(itertools.islice(lines, batch_size))
+		if len(batch) == 0:
+			break
+
+		sentences = PA3.tokenize_batch(batch)
+		if labeled:
+			labels = np.array([int(words.pop()) for words in sentences])
+
+		X = PA3.vectorize(bag, sentences)
+		log_proba = clf.predict_log_proba(X)
+		pred = clf.best_class(log_proba)
+
+		out.write("".join("{}\t{}\n".format(label, "\t".join(
+			"{:.6f}".format(p) for p in row))
+			for label, row in zip(pred.tolist(), log_proba.tolist())))
+		out.flush()
+
+		stats["docs"] += len(batch)
+		if labeled:
+			stats["correct"] += int(np.sum(pred == labels))
+
+	stats["elapsed"] = time.perf_counter() - start
+	return stats
+
+def print_summary(stats, labeled):
+	"""Prints the statistics collected by predict_stream to stderr
+
+	Args:
+		stats - dictionary returned by predict_stream
+		labeled - True if the accuracy should be printed
+
+	Returns:
+		(none)
+	"""
+	rate = stats["docs"] / stats["elapsed"] if stats["elapsed"] > 0 \
+		else float("inf")
+	sys.stderr.write("Classified {} reviews in {:.3f}s ({:.0f} docs/sec)\n"
+		.format(stats["docs"], stats["elapsed"], rate))
+
+	if labeled and stats["docs"] > 0:
+		sys.stderr.write("Accuracy:\t{}\n".format(
+			stats["correct"] / stats["docs"]))
+
+if __name__ == '__main__':
+	main()